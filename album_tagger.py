@@ -1,41 +1,235 @@
+import argparse
+import contextlib
+import csv
+import heapq
+import hashlib
+import io
+import json
 import os
+import sys
+import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
 
-from mutagen.id3 import ID3, TPE1, TIT2, TALB, TCON, TRCK, TDRC, APIC, error
-from mutagen.mp3 import MP3
-from mutagen.flac import FLAC
-from mutagen.mp4 import MP4
+# mutagen's format modules, the process pool, sqlite3 and cProfile are imported
+# where they are first used so scripted runs and --help start quickly.
+if TYPE_CHECKING:
+    import sqlite3
+    from concurrent.futures import Executor
 
 # --- CONFIGURATION ---
 # Supported audio and image extensions
 AUDIO_EXTS = ['.mp3', '.flac', '.m4a', '.mp4']
 IMAGE_EXTS = ['.jpg', '.jpeg', '.png']
+AUDIO_EXT_SET = frozenset(AUDIO_EXTS)
+# Tag layout used for each audio extension
+AUDIO_KINDS = {'.mp3': 'mp3', '.flac': 'flac', '.m4a': 'mp4', '.mp4': 'mp4'}
+IMAGE_EXT_SET = frozenset(IMAGE_EXTS)
 # Default genre tags for quick entry
 DEFAULT_GENRE = "Imperial Underground"
+# Default artist suggested when none is supplied
+DEFAULT_ARTIST = "Unknown Smuggler"
+# Room reserved for future edits when a tag no longer fits its padding (KB)
+DEFAULT_PADDING_KB = 16
 # ---
 
+# --- RECORDS ---
+class Album:
+    """Album-wide metadata shared by all of an album's tracks.
+
+    Slotted, and its strings are interned: a large library repeats the
+    same few artists, genres and years, so each distinct value is stored once.
+    """
+    __slots__ = ('title', 'artist', 'genre', 'year')
+
+    def __init__(self, title: str, artist: str, genre: str, year: str):
+        self.title = sys.intern(title)
+        self.artist = sys.intern(artist)
+        self.genre = sys.intern(genre)
+        self.year = sys.intern(year)
+
+    def as_dict(self) -> Dict[str, str]:
+        """Plain form for journals and reports."""
+        return {'title': self.title, 'artist': self.artist, 'genre': self.genre, 'year': self.year}
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, str]) -> 'Album':
+        return cls(values['title'], values['artist'], values['genre'], values['year'])
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Album) and self.as_dict() == other.as_dict()
+
+    def __repr__(self) -> str:
+        return f"Album({self.title!r}, {self.artist!r}, {self.genre!r}, {self.year!r})"
+
+class Track:
+    """One confirmed track: its file name in the album folder, title and track number.
+
+    ``number`` is None until known; apply_tags then numbers tracks by their
+    position in the tracklist.
+    """
+    __slots__ = ('file_name', 'title', 'number')
+
+    def __init__(self, file_name: str, title: str, number: Optional[int] = None):
+        self.file_name = file_name
+        self.title = title
+        self.number = number
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, Track)
+                and (self.file_name, self.title, self.number) == (other.file_name, other.title, other.number))
+
+    def __repr__(self) -> str:
+        return f"Track({self.file_name!r}, {self.title!r}, {self.number!r})"
+
+# (file name, stat result captured during the directory scan)
+AudioEntry = Tuple[str, os.stat_result]
+# (album directory, audio entries in name order, image file names in name order)
+AlbumFolder = Tuple[str, List[AudioEntry], List[str]]
+
+def scan_album_dir(directory: str) -> Tuple[List[AudioEntry], List[str], List[str]]:
+    """Reads one directory in a single scandir pass.
+
+    Returns audio files (with the stat result cached on their DirEntry),
+    candidate cover images and sub-directory paths, each sorted by name.
+    """
+    audio: List[AudioEntry] = []
+    images: List[str] = []
+    subdirs: List[str] = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+                continue
+            ext = os.path.splitext(entry.name)[1].lower()
+            if ext in AUDIO_EXT_SET:
+                if entry.is_file():
+                    audio.append((entry.name, entry.stat()))
+            elif ext in IMAGE_EXT_SET:
+                images.append(entry.name)
+    audio.sort(key=lambda item: item[0])
+    images.sort()
+    subdirs.sort()
+    return audio, images, subdirs
+
+def walk_library(root: str, log: Callable[[str], None] = print) -> Iterator[AlbumFolder]:
+    """Lazily yields every folder below ``root`` that contains audio files.
+
+    Folders are visited depth-first in name order and each one is yielded as
+    soon as it has been read, so callers can start work before the walk ends.
+    Only the pending sub-directory paths are held in memory. Folders that
+    cannot be read are reported through ``log`` and skipped.
+    """
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            audio, images, subdirs = scan_album_dir(directory)
+        except OSError as e:
+            log(f"  ⚠️ Cannot read {directory}: {e}")
+            continue
+        pending.extend(reversed(subdirs))
+        if audio:
+            yield directory, audio, images
+
 def get_audio_files(directory: str) -> List[str]:
     """Scans the directory for supported audio files."""
-    return sorted([
-        f for f in os.listdir(directory)
-        if any(f.lower().endswith(ext) for ext in AUDIO_EXTS)
-    ])
+    audio, _, _ = scan_album_dir(directory)
+    return [file_name for file_name, _ in audio]
+
+def get_file_kind(file_path: str) -> Optional[str]:
+    """Returns 'mp3', 'flac' or 'mp4' for supported files, otherwise None."""
+    return AUDIO_KINDS.get(os.path.splitext(file_path)[1].lower())
 
 def get_file_handler(file_path: str):
     """Returns the correct mutagen handler based on file extension."""
-    if file_path.lower().endswith('.mp3'):
+    kind = get_file_kind(file_path)
+    if kind == 'mp3':
+        from mutagen.id3 import ID3
+        from mutagen.mp3 import MP3
         return MP3(file_path, ID3=ID3)
-    elif file_path.lower().endswith('.flac'):
+    elif kind == 'flac':
+        from mutagen.flac import FLAC
         return FLAC(file_path)
-    elif file_path.lower().endswith('.m4a') or file_path.lower().endswith('.mp4'):
+    elif kind == 'mp4':
         # Added M4A/MP4 support just in case, requires mutagen.mp4
+        from mutagen.mp4 import MP4
         return MP4(file_path)
     else:
         return None
 
-def determine_mime_type(file_name: str) -> str:
-    """Returns the MIME type for supported image extensions."""
+def read_tags_only(file_path: str) -> Optional[SimpleNamespace]:
+    """Reads only a file's tags, skipping the stream info the full handlers parse.
+
+    MP3 reads the ID3v2 header and frames (no MPEG frame sync / bitrate
+    scan), FLAC walks the metadata block headers and decodes only the
+    VORBIS_COMMENT and PICTURE blocks, and MP4 parses the atom tree and the
+    ``moov/udta/meta/ilst`` items (no track/codec info). The result exposes
+    ``tags`` and ``pictures`` like a mutagen handler, so it can be passed to
+    tags_match. Returns None for unsupported files.
+    """
+    kind = get_file_kind(file_path)
+    if kind == 'mp3':
+        from mutagen.id3 import ID3, ID3NoHeaderError
+        try:
+            tags = ID3(file_path)
+        except ID3NoHeaderError:
+            tags = None
+        return SimpleNamespace(tags=tags, pictures=[])
+    if kind == 'flac':
+        return read_flac_metadata(file_path)
+    if kind == 'mp4':
+        from mutagen.mp4 import Atoms, MP4MetadataError, MP4Tags
+        with open(file_path, 'rb') as f:
+            atoms = Atoms(f)
+            try:
+                tags = MP4Tags(atoms, f)
+            except MP4MetadataError:
+                tags = None
+        return SimpleNamespace(tags=tags, pictures=[])
+    return None
+
+def read_flac_metadata(file_path: str) -> SimpleNamespace:
+    """Decodes the Vorbis comment and PICTURE blocks of a FLAC file, seeking past the rest."""
+    from mutagen.flac import FLACNoHeaderError, Picture, VCFLACDict, error as FLACError
+
+    tags = None
+    pictures = []
+    with open(file_path, 'rb') as f:
+        # Some taggers prepend an ID3v2 tag
+        f.seek(skip_id3v2(f))
+        if f.read(4) != b'fLaC':
+            raise FLACNoHeaderError(f"{file_path} is not a FLAC file")
+
+        is_last = False
+        while not is_last:
+            block_header = f.read(4)
+            if len(block_header) < 4:
+                raise FLACError(f"{file_path}: truncated FLAC metadata")
+            is_last = bool(block_header[0] & 0x80)
+            code = block_header[0] & 0x7F
+            length = int.from_bytes(block_header[1:], 'big')
+            if code == VCFLACDict.code:
+                tags = VCFLACDict(f.read(length))
+            elif code == Picture.code:
+                pictures.append(Picture(f.read(length)))
+            else:
+                f.seek(length, 1)
+    return SimpleNamespace(tags=tags, pictures=pictures)
+
+def determine_mime_type(file_name: str, data: Optional[bytes] = None) -> str:
+    """Returns the MIME type for supported image extensions.
+
+    When the image ``data`` is given its signature wins over the extension,
+    so converted or mislabeled covers are embedded with the right type.
+    """
+    if data is not None:
+        if data.startswith(b'\x89PNG\r\n\x1a\n'):
+            return 'image/png'
+        if data.startswith(b'\xff\xd8\xff'):
+            return 'image/jpeg'
     if file_name.lower().endswith('.png'):
         return 'image/png'
     return 'image/jpeg'
@@ -45,6 +239,19 @@ def infer_album_title(directory: str) -> str:
     folder_name = os.path.basename(os.path.normpath(directory))
     return folder_name or "Untitled Album"
 
+# Hidden Tk root shared by every file picker of the session (created on first use)
+_tk_root = None
+
+def get_tk_root():
+    """Returns the hidden Tk root, creating it the first time a dialog is needed."""
+    global _tk_root
+    if _tk_root is None:
+        from tkinter import Tk
+
+        _tk_root = Tk()
+        _tk_root.withdraw()
+    return _tk_root
+
 def prompt_for_manual_cover_art() -> Tuple[Optional[str], Optional[str]]:
     """Allows the user to manually pick a cover image via dialog or path input."""
     wants_manual = input("Would you like to select a cover image manually? (Y/n): ").strip().lower()
@@ -54,17 +261,13 @@ def prompt_for_manual_cover_art() -> Tuple[Optional[str], Optional[str]]:
     selected_path: Optional[str] = None
 
     try:
-        from tkinter import Tk, filedialog
+        from tkinter import filedialog
 
-        root = Tk()
-        root.withdraw()
-        try:
-            selected_path = filedialog.askopenfilename(
-                title="Select cover art image",
-                filetypes=[("Image files", "*.jpg *.jpeg *.png")]
-            )
-        finally:
-            root.destroy()
+        selected_path = filedialog.askopenfilename(
+            parent=get_tk_root(),
+            title="Select cover art image",
+            filetypes=[("Image files", "*.jpg *.jpeg *.png")]
+        )
     except Exception as dialog_error:
         print(f"⚠️ Unable to open file picker ({dialog_error}).")
         selected_path = input("Enter full path to image file (or press Enter to skip): ").strip() or None
@@ -76,11 +279,15 @@ def prompt_for_manual_cover_art() -> Tuple[Optional[str], Optional[str]]:
         print("⚠️ Provided cover art path does not exist. Skipping cover art.")
         return None, None
 
-    mime = determine_mime_type(selected_path)
-    print(f"\n✅ Using manual cover art: {selected_path}")
-    return selected_path, mime
+    info = probe_image(selected_path)
+    if info['error']:
+        print(f"⚠️ Provided cover art is not usable ({info['error']}). Skipping cover art.")
+        return None, None
+
+    print(f"\n✅ Using manual cover art: {selected_path} ({describe_image(info)})")
+    return selected_path, info['mime']
 
-def confirm_tracklist(track_files: List[str]) -> List[Tuple[str, str]]:
+def confirm_tracklist(track_files: List[str]) -> List[Track]:
     """Confirms track names and order, allowing tracks to be skipped."""
     print("\n--- TRACKLIST CONFIRMATION ---")
     confirmed_tracks = []
@@ -99,14 +306,14 @@ def confirm_tracklist(track_files: List[str]) -> List[Tuple[str, str]]:
         
         elif choice == 'rename' or choice == 'r':
             new_title = input(f"  Enter new title for track {i+1}: ")
-            confirmed_tracks.append((file_name, new_title))
+            confirmed_tracks.append(Track(file_name, new_title))
             
         else: # Default is 'Y' or Enter
-            confirmed_tracks.append((file_name, current_name))
+            confirmed_tracks.append(Track(file_name, current_name))
             
     print("\n--- FINAL TRACKLIST ---")
-    for i, (file_name, title) in enumerate(confirmed_tracks):
-        print(f"  {i+1}. {title} ({file_name})")
+    for i, track in enumerate(confirmed_tracks):
+        print(f"  {i+1}. {track.title} ({track.file_name})")
     
     confirm = input("Confirm final tracklist order? (Y/n): ").lower()
     if confirm != 'y' and confirm != '':
@@ -115,26 +322,159 @@ def confirm_tracklist(track_files: List[str]) -> List[Tuple[str, str]]:
     
     return confirmed_tracks
 
+def list_cover_candidates(directory: str) -> List[str]:
+    """Lists the image files in a directory that could serve as cover art."""
+    _, images, _ = scan_album_dir(directory)
+    return images
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_IEND = b'\x00\x00\x00\x00IEND\xaeB`\x82'
+# PNG colour type -> mode, JPEG component count -> mode (Pillow naming)
+PNG_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+JPEG_MODES = {1: 'L', 3: 'RGB', 4: 'CMYK'}
+# JPEG start-of-frame markers (baseline, extended, progressive, lossless, arithmetic)
+JPEG_SOF_MARKERS = frozenset((0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF))
+# Bytes at the end of a JPEG searched for its EOI marker (encoders append padding, cameras add trailers)
+JPEG_TAIL_BYTES = 64 * 1024
+
+def probe_image(file_path: str) -> Dict:
+    """Describes a cover image from its headers without decoding it.
+
+    Reads the PNG IHDR chunk or walks the JPEG segment headers up to the
+    start-of-frame marker, then checks the file ends with IEND / EOI. The
+    result holds ``format``, ``mime``, ``width``, ``height``, ``mode``,
+    ``progressive`` and ``bytes``; ``error`` is non-empty when the file is
+    unreadable, truncated, not a PNG/JPEG or carries the other format's
+    extension. A JPEG with a valid frame header but no end-of-image marker
+    near its end (a long camera or motion-photo trailer, or a cut-off scan)
+    is kept with a ``warning`` instead.
+    """
+    info = {'path': file_path, 'format': None, 'mime': None, 'width': 0, 'height': 0,
+            'mode': None, 'progressive': False, 'bytes': 0, 'error': '', 'warning': ''}
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            info['bytes'] = size
+            head = f.read(33)
+            if head.startswith(PNG_SIGNATURE):
+                info['format'] = 'PNG'
+                if len(head) < 33 or head[12:16] != b'IHDR':
+                    info['error'] = "truncated PNG header"
+                    return info
+                info['width'], info['height'] = int.from_bytes(head[16:20], 'big'), int.from_bytes(head[20:24], 'big')
+                info['mode'] = PNG_MODES.get(head[25])
+                f.seek(max(size - len(PNG_IEND), 0))
+                if f.read() != PNG_IEND:
+                    info['error'] = "truncated PNG (no IEND chunk)"
+            elif head.startswith(b'\xff\xd8'):
+                info['format'] = 'JPEG'
+                f.seek(2)
+                while True:
+                    marker = f.read(2)
+                    while marker[:1] == b'\xff' and marker[1:] == b'\xff':
+                        marker = marker[1:] + f.read(1)  # fill bytes
+                    if len(marker) < 2 or marker[0] != 0xFF:
+                        info['error'] = "truncated JPEG (no frame header)"
+                        return info
+                    code = marker[1]
+                    if code == 0x01 or 0xD0 <= code <= 0xD7:
+                        continue
+                    length_bytes = f.read(2)
+                    if len(length_bytes) < 2 or code in (0xD9, 0xDA):
+                        info['error'] = "truncated JPEG (no frame header)"
+                        return info
+                    length = int.from_bytes(length_bytes, 'big')
+                    if code in JPEG_SOF_MARKERS:
+                        frame = f.read(6)
+                        if len(frame) < 6:
+                            info['error'] = "truncated JPEG frame header"
+                            return info
+                        info['height'] = int.from_bytes(frame[1:3], 'big')
+                        info['width'] = int.from_bytes(frame[3:5], 'big')
+                        info['mode'] = JPEG_MODES.get(frame[5])
+                        info['progressive'] = code in (0xC2, 0xC6, 0xCA, 0xCE)
+                        break
+                    f.seek(length - 2, os.SEEK_CUR)
+                f.seek(max(size - JPEG_TAIL_BYTES, 0))
+                if b'\xff\xd9' not in f.read():
+                    info['warning'] = "no end-of-image marker near the end of the file"
+            else:
+                info['error'] = "not a PNG or JPEG image"
+                return info
+    except OSError as e:
+        info['error'] = str(e)
+        return info
+
+    info['mime'] = 'image/png' if info['format'] == 'PNG' else 'image/jpeg'
+    if not info['error'] and determine_mime_type(file_path) != info['mime']:
+        info['error'] = f"{info['format']} data with a {os.path.splitext(file_path)[1]} extension"
+    if not info['error'] and not (info['width'] and info['height']):
+        info['error'] = "image has no dimensions"
+    return info
+
+# Words in an image's name that mark it as the front cover, or as some other artwork
+COVER_FRONT_WORDS = frozenset(('front', 'cover'))
+COVER_FOLDER_WORDS = frozenset(('folder', 'album', 'albumart'))
+COVER_OTHER_WORDS = frozenset(('back', 'inlay', 'inside', 'tray', 'disc', 'cd', 'booklet', 'spine', 'rear'))
+
+def cover_name_hint(file_name: str) -> int:
+    """How much an image's name suggests a front cover: 2 front/cover, 1 folder/album, 0 neutral, -1 other art."""
+    words = set(''.join(ch if ch.isalnum() else ' ' for ch in os.path.splitext(file_name.lower())[0]).split())
+    if words & COVER_OTHER_WORDS:
+        return -1
+    if words & COVER_FRONT_WORDS:
+        return 2
+    if words & COVER_FOLDER_WORDS:
+        return 1
+    return 0
+
+def cover_rank(file_name: str, info: Dict) -> Tuple[int, bool, int]:
+    """Sort key (higher is better): name hint, near-square shape, then shorter side in pixels."""
+    short_side, long_side = sorted((info['width'], info['height']))
+    return cover_name_hint(file_name), short_side >= 0.95 * long_side, short_side
+
+def rank_cover_candidates(
+    directory: str,
+    images: List[str],
+    log: Callable[[str], None] = print
+) -> List[Tuple[str, Dict]]:
+    """Probes the candidate images and returns the valid ones, best cover first."""
+    ranked = []
+    for file_name in images:
+        info = probe_image(os.path.join(directory, file_name))
+        if info['error']:
+            log(f"  ⚠️ Ignoring {file_name}: {info['error']}.")
+            continue
+        if info['warning']:
+            log(f"  ⚠️ {file_name}: {info['warning']}; it may be truncated.")
+        ranked.append((file_name, info))
+    ranked.sort(key=lambda item: cover_rank(item[0], item[1]), reverse=True)
+    return ranked
+
+def describe_image(info: Dict) -> str:
+    """Short human description of a probed image, e.g. '1400x1400 JPEG RGB, 512.0 KB'."""
+    return f"{info['width']}x{info['height']} {info['format']} {info['mode'] or '?'}, {format_bytes(info['bytes'])}"
+
 def find_cover_art(directory: str) -> Tuple[Optional[str], Optional[str]]:
-    """Finds or prompts for a cover art image."""
-    images = [
-        f for f in os.listdir(directory)
-        if any(f.lower().endswith(ext) for ext in IMAGE_EXTS)
-    ]
+    """Finds or prompts for a cover art image.
+
+    Candidates are probed first: broken or mislabeled images are never
+    offered, and the rest are listed best match first.
+    """
+    images = rank_cover_candidates(directory, list_cover_candidates(directory))
 
     if len(images) == 1:
-        img_file = images[0]
+        img_file, info = images[0]
         img_path = os.path.join(directory, img_file)
-        mime = determine_mime_type(img_file)
-        print(f"\n✅ Found cover art: {img_file}")
-        return img_path, mime
+        print(f"\n✅ Found cover art: {img_file} ({describe_image(info)})")
+        return img_path, info['mime']
 
     if len(images) > 1:
         print(f"\n⚠️ {len(images)} images detected. Please choose which one to embed:")
-        for idx, name in enumerate(images, start=1):
-            print(f"  {idx}. {name}")
+        for idx, (name, info) in enumerate(images, start=1):
+            print(f"  {idx}. {name} ({describe_image(info)})")
 
-        selection = input("Select image number or press Enter to use the first: ").strip()
+        selection = input("Select image number or press Enter to use the best match (1): ").strip()
         chosen_index = 0
         if selection.isdigit():
             numeric_choice = int(selection) - 1
@@ -142,16 +482,15 @@ def find_cover_art(directory: str) -> Tuple[Optional[str], Optional[str]]:
                 chosen_index = numeric_choice
             else:
                 print("⚠️ Invalid choice. Defaulting to the first image.")
-        img_file = images[chosen_index]
+        img_file, info = images[chosen_index]
         img_path = os.path.join(directory, img_file)
-        mime = determine_mime_type(img_file)
         print(f"\n✅ Using cover art: {img_file}")
-        return img_path, mime
+        return img_path, info['mime']
 
     print("\n❌ No cover art image (*.jpg/*.png) detected in this folder.")
     return prompt_for_manual_cover_art()
 
-def get_user_metadata(default_artist: str, default_album_title: str) -> Dict[str, str]:
+def get_user_metadata(default_artist: str, default_album_title: str) -> Album:
     """Collects album metadata with quality-of-life defaults."""
     print("\n--- ALBUM METADATA ---")
 
@@ -172,88 +511,2237 @@ def get_user_metadata(default_artist: str, default_album_title: str) -> Dict[str
         f"Enter Release Year (Default: {current_year}): "
     ).strip() or current_year
 
+    return Album(album_title, artist_name, genre_tag, album_year)
+
+def hash_bytes(data: bytes) -> str:
+    """Content hash used to compare embedded pictures."""
+    return hashlib.sha256(data).hexdigest()
+
+# Recently shrunk covers by (source sha256, max px, max KB), most recent last, so a cover shared by
+# consecutive albums is converted once. None means the source needed no change (its bytes are not kept).
+COVER_CACHE: Dict[Tuple[str, int, int], Optional[bytes]] = {}
+# Entries kept in COVER_CACHE; longer runs rely on the on-disk --cover-cache
+COVER_CACHE_ENTRIES = 8
+# JPEG qualities tried, best first, until a cover fits its byte cap
+COVER_JPEG_QUALITIES = (90, 85, 75, 65, 55)
+# Covers are never scaled below this edge length to meet the byte cap
+COVER_MIN_PX = 300
+_pillow_warned = False
+
+def remember_cover(key: Tuple[str, int, int], value: Optional[bytes]) -> None:
+    """Stores a shrink result in COVER_CACHE, dropping the least recently used entries."""
+    COVER_CACHE.pop(key, None)
+    COVER_CACHE[key] = value
+    while len(COVER_CACHE) > COVER_CACHE_ENTRIES:
+        del COVER_CACHE[next(iter(COVER_CACHE))]
+
+def encode_cover(image, fmt: str, quality: int = 90) -> bytes:
+    """Encodes a Pillow image as PNG or progressive JPEG."""
+    from PIL import Image
+
+    out = io.BytesIO()
+    if fmt == 'PNG':
+        image.save(out, 'PNG', optimize=True)
+    else:
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # JPEG has no alpha: flatten transparent scans onto white
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.save(out, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+def shrink_cover_art(
+    data: bytes,
+    max_px: int = 0,
+    max_kb: int = 0,
+    log: Callable[[str], None] = print,
+    source_hash: Optional[str] = None
+) -> bytes:
+    """Caps a cover's dimensions and byte size before it is embedded (needs Pillow).
+
+    Images wider or taller than ``max_px`` are scaled down. PNG covers are
+    re-encoded as progressive JPEG when that is smaller. If the result is
+    still over ``max_kb``, the JPEG quality is lowered step by step, then
+    the image is scaled down further. Unchanged input is returned as is.
+    A zero limit means no limit. Without Pillow, or for an unreadable
+    image, the original bytes are returned and a warning is logged. Pass
+    ``source_hash`` when the sha256 of ``data`` is already known.
+    """
+    global _pillow_warned
+    key = (source_hash or hash_bytes(data), max_px, max_kb)
+    if key in COVER_CACHE:
+        cached = COVER_CACHE.pop(key)
+        COVER_CACHE[key] = cached
+        return data if cached is None else cached
+
+    try:
+        from PIL import Image
+    except ImportError:
+        if not _pillow_warned:
+            log("  ⚠️ Pillow is not installed (pip install Pillow); embedding cover art unchanged.")
+            _pillow_warned = True
+        return data
+
+    max_bytes = max_kb * 1024
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            source_format = source.format
+            width, height = source.size
+            too_large = max_px and max(width, height) > max_px
+            if not too_large and source_format != 'PNG' and not (max_bytes and len(data) > max_bytes):
+                remember_cover(key, None)
+                return data
+
+            if too_large and source_format == 'JPEG':
+                # Let the JPEG decoder scale by 1/2..1/8 before resampling
+                source.draft('RGB', (max_px, max_px))
+            image = source.copy()
+            if too_large:
+                image.thumbnail((max_px, max_px), Image.LANCZOS)
+
+            candidates = [encode_cover(image, 'JPEG')]
+            if source_format == 'PNG':
+                candidates.append(encode_cover(image, 'PNG') if too_large else data)
+            elif not too_large:
+                candidates.append(data)
+            best = min(candidates, key=len)
+
+            quality = iter(COVER_JPEG_QUALITIES[1:])
+            while max_bytes and len(best) > max_bytes:
+                next_quality = next(quality, None)
+                if next_quality is None:
+                    if max(image.size) * 3 // 4 < COVER_MIN_PX:
+                        break
+                    image.thumbnail((max(image.size) * 3 // 4,) * 2, Image.LANCZOS)
+                    next_quality = COVER_JPEG_QUALITIES[-1]
+                best = min(best, encode_cover(image, 'JPEG', next_quality), key=len)
+
+        if best is not data:
+            with Image.open(io.BytesIO(best)) as result:
+                log(f"  🖼️ Cover art: {width}x{height} {source_format} {format_bytes(len(data))} -> "
+                    f"{result.size[0]}x{result.size[1]} {result.format} {format_bytes(len(best))}")
+    except Exception as e:
+        log(f"  ⚠️ Unable to process cover art ({e}). Embedding it unchanged.")
+        return data
+
+    remember_cover(key, None if best is data else best)
+    return best
+
+def prepare_cover_art(
+    cover_art_path: str,
+    mime_type: str,
+    kinds=('mp3', 'flac'),
+    data: Optional[bytes] = None
+) -> Dict:
+    """Reads the cover image once and builds the embeddable frames for the album's formats.
+
+    The returned dict holds the raw ``data``, its ``mime`` and ``sha256`` plus,
+    depending on ``kinds``, a ready ``apic`` frame (MP3) and ``picture`` block
+    (FLAC) that can be reused for each track of the album. Pass ``data`` when
+    the image bytes were already read (e.g. by the prefetcher).
+    """
+    if data is None:
+        with open(cover_art_path, 'rb') as f:
+            data = f.read()
+
+    cover = {'data': data, 'mime': mime_type, 'sha256': hash_bytes(data)}
+
+    if 'mp3' in kinds:
+        from mutagen.id3 import APIC
+        cover['apic'] = APIC(
+            encoding=3,
+            mime=mime_type,
+            type=3, # 3 is Front Cover
+            desc=u'Cover',
+            data=data
+        )
+
+    if 'flac' in kinds:
+        from mutagen.flac import Picture
+        picture = Picture()
+        picture.type = 3
+        picture.mime = mime_type
+        picture.data = data
+        cover['picture'] = picture
+
+    return cover
+
+# ID3 frames written for MP3 files
+ID3_FRAME_IDS = ('TPE1', 'TIT2', 'TALB', 'TCON', 'TRCK', 'TDRC')
+
+def build_tag_values(
+    kind: str,
+    track_title: str,
+    track_number: int,
+    total_tracks: int,
+    album: Album
+) -> Dict[str, list]:
+    """Returns the desired tags for one track, keyed the way each format stores them."""
+    if kind == 'mp3':
+        return {
+            'TPE1': [album.artist],
+            'TIT2': [track_title],
+            'TALB': [album.title],
+            'TCON': [album.genre],
+            'TRCK': [f"{track_number}/{total_tracks}"],
+            'TDRC': [album.year],
+        }
+    if kind == 'mp4':
+        # iTunes-style atoms; MP4 has no free-form Vorbis keys
+        return {
+            '\xa9ART': [album.artist],
+            '\xa9nam': [track_title],
+            '\xa9alb': [album.title],
+            '\xa9gen': [album.genre],
+            'trkn': [(track_number, total_tracks)],
+            '\xa9day': [album.year],
+        }
     return {
-        'title': album_title,
-        'artist': artist_name,
-        'genre': genre_tag,
-        'year': album_year
+        'artist': [album.artist],
+        'title': [track_title],
+        'album': [album.title],
+        'genre': [album.genre],
+        'tracknumber': [str(track_number)],
+        'date': [album.year],
     }
 
-def apply_tags(
-    tracklist: List[Tuple[str, str]],
-    album_meta: Dict[str, str],
+def tags_match(audio, kind: str, desired: Dict[str, list], cover: Optional[Dict]) -> bool:
+    """Compares a file's current tags and cover with the desired ones.
+
+    MP3 tags are rewritten from scratch, so any extra frame counts as a
+    difference. FLAC and MP4 only have the managed keys compared; a FLAC file
+    matches when one of its pictures has the same hash as the new cover.
+    """
+    tags = audio.tags
+    if tags is None:
+        return False
+
+    if kind == 'mp3':
+        expected_keys = set(desired)
+        if cover:
+            expected_keys.add('APIC:Cover')
+        if set(tags.keys()) != expected_keys:
+            return False
+        for frame_id, values in desired.items():
+            if [str(text) for text in tags[frame_id].text] != values:
+                return False
+        if cover:
+            apic = tags['APIC:Cover']
+            return apic.mime == cover['mime'] and hash_bytes(apic.data) == cover['sha256']
+        return True
+
+    for key, values in desired.items():
+        if tags.get(key) != values:
+            return False
+    if kind == 'flac' and cover:
+        front_covers = [picture for picture in audio.pictures if picture.type == 3]
+        return len(front_covers) == 1 and hash_bytes(front_covers[0].data) == cover['sha256']
+    return True
+
+def write_tag_values(audio, kind: str, desired: Dict[str, list], cover: Optional[Dict]) -> bool:
+    """Puts the desired tags and cover on a loaded file. Returns True if the cover was embedded."""
+    # Use 'tags' property for FLAC/MP4, or ID3 directly for MP3
+    if kind == 'mp3':
+        # Clear the frames but keep the tag itself so its padding can be reused
+        if audio.tags is None:
+            audio.add_tags()
+        import mutagen.id3
+
+        tags = audio.tags
+        tags.clear()
+        for frame_id, values in desired.items():
+            tags.add(getattr(mutagen.id3, frame_id)(encoding=3, text=values))
+        if cover:
+            tags.add(cover['apic'])
+            return True
+        return False
+
+    if audio.tags is None:
+        audio.add_tags()
+    for key, values in desired.items():
+        audio.tags[key] = values
+    if kind == 'flac' and cover:
+        replace_flac_front_cover(audio, cover)
+        return True
+    return False
+
+def replace_flac_front_cover(audio, cover: Dict) -> None:
+    """Leaves exactly one front cover on a FLAC file.
+
+    Front-cover PICTURE blocks are dropped unless they already hold the new
+    image, in which case the first match is kept instead of embedding the
+    same bytes again. Other picture types (back cover, booklet...) are kept.
+    """
+    from mutagen.flac import Picture
+
+    kept = False
+    blocks = []
+    for block in audio.metadata_blocks:
+        if isinstance(block, Picture) and block.type == 3:
+            if kept or hash_bytes(block.data) != cover['sha256']:
+                continue
+            kept = True
+        blocks.append(block)
+    audio.metadata_blocks = blocks
+    if not kept:
+        audio.add_picture(cover['picture'])
+
+def make_padding_policy(reserve_bytes: int, result: Dict) -> Callable:
+    """Builds a mutagen padding callback that prefers in-place writes.
+
+    Works for the ID3 header, the FLAC PADDING metadata block and MP4 free
+    atoms alike. When the new metadata fits in the space the old metadata
+    occupied, the leftover becomes padding and the audio frames stay where
+    they are. Otherwise the file has to grow anyway, so ``reserve_bytes`` of
+    padding are added for future edits and ``result['rewritten']`` is flagged.
+    """
+    def choose_padding(info) -> int:
+        if info.padding >= 0:
+            return info.padding
+        result['rewritten'] = True
+        return reserve_bytes
+    return choose_padding
+
+def save_audio(audio, kind: str, padding) -> None:
+    """Saves a file with the given padding callback."""
+    if kind == 'mp3':
+        # v1=0 drops any trailing ID3v1 tag, as the old delete-and-rebuild did
+        audio.save(padding=padding, v1=0)
+    else:
+        audio.save(padding=padding)
+
+# --- AUDIO HASH ---
+# Threads re-reading written files for --verify (the work is mostly I/O and hashing)
+VERIFY_THREADS = 4
+# Bytes handed to sha256 per update; large enough that hashing runs at disk speed
+AUDIO_HASH_CHUNK = 1 << 20
+
+def id3v2_size(header: bytes) -> int:
+    """Total size of the ID3v2 tag whose first 10 bytes are ``header``, or 0 if it is not one."""
+    if len(header) < 10 or header[:3] != b'ID3':
+        return 0
+    size = (header[6] & 0x7f) << 21 | (header[7] & 0x7f) << 14 | (header[8] & 0x7f) << 7 | header[9] & 0x7f
+    # Bit 4 of the flags announces a 10 byte footer after the frames
+    return 10 + size + (10 if header[5] & 0x10 else 0)
+
+def skip_id3v2(data) -> int:
+    """Offset of the first byte after any ID3v2 tags at the start of ``data``.
+
+    ``data`` is a buffer (bytes, mmap) or a seekable binary file.
+    """
+    def header_at(offset: int) -> bytes:
+        if hasattr(data, 'read'):
+            data.seek(offset)
+            return data.read(10)
+        return data[offset:offset + 10]
+
+    start = 0
+    while True:
+        size = id3v2_size(header_at(start))
+        if not size:
+            return start
+        start += size
+
+def strip_tag_footers(data, start: int) -> int:
+    """End offset of ``data`` once trailing ID3v1 and APEv2 tags are cut off.
+
+    Writers disagree on which of the two comes last, so both are peeled off
+    until neither is found.
+    """
+    end = len(data)
+    while True:
+        if end - start >= 128 and data[end - 128:end - 125] == b'TAG':
+            end -= 128
+        elif end - start >= 32 and data[end - 32:end - 24] == b'APETAGEX':
+            # The footer's size covers the items and itself; the optional header is extra
+            tag_size = int.from_bytes(data[end - 20:end - 16], 'little')
+            flags = int.from_bytes(data[end - 12:end - 8], 'little')
+            tag_size += 32 if flags & 0x80000000 else 0
+            if tag_size < 32 or tag_size > end - start:
+                # A corrupt footer: keep the rest rather than guess where the tag starts
+                return end
+            end -= tag_size
+        else:
+            return max(end, start)
+
+def mpeg_payload_ranges(data) -> List[Tuple[int, int]]:
+    """The MPEG frames: everything between the ID3v2 header and the ID3v1/APE footers."""
+    start = skip_id3v2(data)
+    return [(start, strip_tag_footers(data, start))]
+
+def flac_payload_ranges(data) -> List[Tuple[int, int]]:
+    """The FLAC frames: everything after the last metadata block."""
+    position = skip_id3v2(data)
+    if data[position:position + 4] != b'fLaC':
+        raise ValueError("not a FLAC stream")
+    position += 4
+    while True:
+        header = data[position:position + 4]
+        if len(header) < 4:
+            raise ValueError("truncated FLAC metadata")
+        position += 4 + int.from_bytes(header[1:4], 'big')
+        if header[0] & 0x80:
+            break
+    if position > len(data):
+        raise ValueError("truncated FLAC metadata")
+    return [(position, strip_tag_footers(data, position))]
+
+def mp4_payload_ranges(data) -> List[Tuple[int, int]]:
+    """The contents of every top-level ``mdat`` atom, in file order."""
+    ranges = []
+    position, end = 0, len(data)
+    while position + 8 <= end:
+        size = int.from_bytes(data[position:position + 4], 'big')
+        atom = data[position + 4:position + 8]
+        header = 8
+        if size == 1:
+            size = int.from_bytes(data[position + 8:position + 16], 'big')
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header:
+            raise ValueError(f"corrupt MP4 atom at offset {position}")
+        if atom == b'mdat':
+            ranges.append((position + header, min(position + size, end)))
+        position += size
+    if not ranges:
+        raise ValueError("no mdat atom")
+    return ranges
+
+AUDIO_PAYLOAD_RANGES = {'mp3': mpeg_payload_ranges, 'flac': flac_payload_ranges, 'mp4': mp4_payload_ranges}
+
+def tag_region_bytes(file_path: str, kind: str) -> int:
+    """Bytes of a file outside its audio payload: the most an in-place tag save rewrites."""
+    import mmap
+
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 or kind not in AUDIO_PAYLOAD_RANGES:
+            return size
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            ranges = AUDIO_PAYLOAD_RANGES[kind](data)
+    return size - sum(end - start for start, end in ranges)
+
+def audio_payload_hash(file_path: str, kind: Optional[str] = None) -> str:
+    """sha256 of a file's audio data alone, so retagging never changes it.
+
+    The file is memory-mapped; only the tag regions' headers are parsed and
+    the audio ranges are fed to the hash in large slices without copying.
+    Raises OSError or ValueError when the file cannot be read or parsed.
+    """
+    import mmap
+
+    kind = kind or get_file_kind(file_path)
+    if kind not in AUDIO_PAYLOAD_RANGES:
+        raise ValueError(f"cannot hash audio of {file_path}")
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{file_path} is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            ranges = AUDIO_PAYLOAD_RANGES[kind](data)
+            with memoryview(data) as view:
+                for start, end in ranges:
+                    for offset in range(start, end, AUDIO_HASH_CHUNK):
+                        with view[offset:min(offset + AUDIO_HASH_CHUNK, end)] as chunk:
+                            digest.update(chunk)
+    return digest.hexdigest()
+
+# --- PROFILING ---
+# Slowest files kept for the --profile report
+PROFILE_TOP_FILES = 10
+
+def new_profile(report_path: Optional[str] = None) -> Dict:
+    """Creates the run-wide accumulator used by --profile.
+
+    ``phases`` aggregates seconds/count/bytes per named phase (run phases such
+    as 'scan' or 'prompts' and per-track steps such as 'track.save', whose
+    bytes are those written: the whole file for a full rewrite, the tag
+    region for an in-place save). The
+    slowest files are kept in a small heap; with ``report_path`` every
+    per-file record is also streamed there as a JSON line.
+    """
+    return {
+        'phases': {},
+        'slowest': [],
+        'report': open(report_path, 'w', encoding='utf-8') if report_path else None,
+    }
+
+def profile_add(profile: Optional[Dict], phase: str, seconds: float, byte_count: int = 0) -> None:
+    """Adds one measurement to a phase's totals. No-op without a profile."""
+    if profile is None:
+        return
+    totals = profile['phases'].setdefault(phase, {'seconds': 0.0, 'count': 0, 'bytes': 0, 'max': 0.0})
+    totals['seconds'] += seconds
+    totals['count'] += 1
+    totals['bytes'] += byte_count
+    totals['max'] = max(totals['max'], seconds)
+
+@contextlib.contextmanager
+def profiled(profile: Optional[Dict], phase: str):
+    """Times the enclosed block into ``phase`` when profiling is on."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile_add(profile, phase, time.perf_counter() - started)
+
+def profile_file(profile: Optional[Dict], file_path: str, record: Dict) -> None:
+    """Folds a tag_track timing record into the step totals and slowest-file list."""
+    if profile is None or not record:
+        return
+    for step, seconds in record['steps'].items():
+        profile_add(profile, f"track.{step}", seconds, record['written_bytes'] if step == 'save' else 0)
+    entry = dict(record, path=file_path, seconds=sum(record['steps'].values()))
+    heapq.heappush(profile['slowest'], (entry['seconds'], file_path, entry))
+    if len(profile['slowest']) > PROFILE_TOP_FILES:
+        heapq.heappop(profile['slowest'])
+    if profile['report'] is not None:
+        profile['report'].write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+def embedded_picture_bytes(audio, kind: str) -> int:
+    """Total size of the pictures a loaded file already carries."""
+    if audio is None or audio.tags is None:
+        return 0
+    if kind == 'mp3':
+        return sum(len(frame.data) for frame in audio.tags.getall('APIC'))
+    if kind == 'flac':
+        return sum(len(picture.data) for picture in audio.pictures)
+    return sum(len(cover) for cover in audio.tags.get('covr', []))
+
+def print_profile_report(profile: Dict) -> None:
+    """Prints per-phase totals and the slowest files."""
+    print("\n--- PROFILE ---")
+    print(f"{'Phase':<14}{'Total s':>10}{'Count':>8}{'Mean ms':>10}{'Max ms':>10}{'Bytes':>12}")
+    for phase, totals in profile['phases'].items():
+        mean_ms = totals['seconds'] / totals['count'] * 1000 if totals['count'] else 0.0
+        print(f"{phase:<14}{totals['seconds']:>10.3f}{totals['count']:>8}{mean_ms:>10.2f}"
+              f"{totals['max'] * 1000:>10.2f}{format_bytes(totals['bytes']):>12}")
+
+    if profile['slowest']:
+        print("\nSlowest files:")
+        for seconds, _, entry in sorted(profile['slowest'], key=lambda item: item[0], reverse=True):
+            steps = ', '.join(f"{step} {value * 1000:.1f}" for step, value in entry['steps'].items())
+            print(f"  {seconds * 1000:8.1f} ms  {entry['path']}")
+            print(f"              ({steps} ms; file {format_bytes(entry['file_bytes'])}, "
+                  f"embedded pictures {format_bytes(entry['picture_bytes'])})")
+
+def try_audio_payload_hash(file_path: str, kind: str) -> Optional[str]:
+    """audio_payload_hash, or None when the file cannot be parsed; a hash never fails a write."""
+    try:
+        return audio_payload_hash(file_path, kind)
+    except (OSError, ValueError):
+        return None
+
+# Cover prepared by this (worker) process, by (sha256, mime, kinds); see job_cover
+WORKER_COVERS: Dict[Tuple[str, str, Tuple[str, ...]], Dict] = {}
+
+def job_cover(job: Dict) -> Optional[Dict]:
+    """The cover to embed for a job.
+
+    In-process jobs carry the prepared cover itself. Pool jobs only carry a
+    ``cover_ref`` (sha256, spill file, mime, kinds): the worker reads and
+    prepares the cover on first use and keeps it for the album's other
+    tracks, so the image crosses the process boundary once per worker. The
+    frames built depend on the album's formats, so albums sharing artwork
+    but not formats do not share an entry.
+    """
+    ref = job.get('cover_ref')
+    if ref is None:
+        return job['cover']
+    key = (ref['sha256'], ref['mime'], tuple(sorted(ref['kinds'])))
+    cover = WORKER_COVERS.get(key)
+    if cover is None:
+        with open(ref['file'], 'rb') as f:
+            cover = prepare_cover_art(ref['file'], ref['mime'], ref['kinds'], f.read())
+        # Albums are tagged one after another; only the current cover is worth keeping
+        WORKER_COVERS.clear()
+        WORKER_COVERS[key] = cover
+    return cover
+
+def tag_track(job: Dict) -> Dict:
+    """Writes the tags for a single track.
+
+    Runs in-process or on a pool worker, so it only takes and returns plain
+    picklable values. The result holds the ``outcome`` ('written',
+    'unchanged', 'skipped' or 'failed'), the log ``message`` for skips and
+    failures, whether the cover was embedded and whether the save had to
+    rewrite the whole file. With ``skip_unchanged`` the file is only saved
+    when its current tags differ from the desired ones. With ``profile`` set,
+    ``result['profile']`` holds per-step timings and the file's byte sizes.
+    An in-process job may carry an already parsed handler as ``audio``
+    (see prefetch_album); it is used instead of opening the file again.
+    With ``hash_audio`` set, ``result['audio_hash']`` holds the audio
+    payload hash of the file as it was left (None if it could not be read).
+    With ``verify`` set, ``result['audio_hash_before']`` holds the hash taken
+    just before the save, for verify_track.
+    """
+    file_name = job['file_name']
+    result = {'outcome': 'written', 'message': '', 'cover_embedded': False, 'rewritten': False}
+    steps: Dict[str, float] = {}
+    if job['profile']:
+        result['profile'] = {'steps': steps, 'file_bytes': 0, 'picture_bytes': 0, 'written_bytes': 0}
+    clock = time.perf_counter()
+
+    def lap(step: str) -> None:
+        nonlocal clock
+        now = time.perf_counter()
+        steps[step] = now - clock
+        clock = now
+
+    try:
+        kind = get_file_kind(job['path'])
+        if kind is None:
+            result['outcome'] = 'skipped'
+            result['message'] = f"  [SKIPPED] Cannot handle file type for {file_name}"
+            return result
+        cover = job_cover(job)
+        if job['profile']:
+            result['profile']['file_bytes'] = os.path.getsize(job['path'])
+
+        desired = build_tag_values(kind, job['title'], job['number'], job['total'], job['album'])
+        audio = job.get('audio')
+        # The diff only needs the tags, so the cheap reader is enough here
+        if job['skip_unchanged']:
+            snapshot = audio if audio is not None else read_tags_only(job['path'])
+            unchanged = tags_match(snapshot, kind, desired, cover)
+            lap('diff')
+            if job['profile']:
+                result['profile']['picture_bytes'] = embedded_picture_bytes(snapshot, kind)
+            if unchanged:
+                result['outcome'] = 'unchanged'
+                if job.get('hash_audio'):
+                    result['audio_hash'] = try_audio_payload_hash(job['path'], kind)
+                return result
+
+        if audio is None:
+            audio = get_file_handler(job['path'])
+        lap('open')
+        if job['profile'] and not job['skip_unchanged']:
+            result['profile']['picture_bytes'] = embedded_picture_bytes(audio, kind)
+        result['cover_embedded'] = write_tag_values(audio, kind, desired, cover)
+        lap('build')
+        if job.get('verify'):
+            result['audio_hash_before'] = try_audio_payload_hash(job['path'], kind)
+            lap('hash')
+        save_audio(audio, kind, make_padding_policy(job['padding_kb'] * 1024, result))
+        lap('save')
+        if job['profile']:
+            # A full rewrite writes the whole file; an in-place save only its tag region
+            try:
+                result['profile']['written_bytes'] = (
+                    os.path.getsize(job['path']) if result['rewritten'] else tag_region_bytes(job['path'], kind)
+                )
+            except (OSError, ValueError):
+                result['profile']['written_bytes'] = result['profile']['file_bytes']
+        # With verify the after-hash is taken by verify_track instead
+        if job.get('hash_audio') and not job.get('verify'):
+            result['audio_hash'] = try_audio_payload_hash(job['path'], kind)
+            lap('hash')
+        return result
+        
+    except Exception as e:
+        result['outcome'] = 'failed'
+        if type(e).__module__.startswith('mutagen'):
+            result['message'] = f"  [ERROR] Mutagen error on {file_name}: {e}"
+        else:
+            result['message'] = f"  [ERROR] Unexpected error on {file_name}: {e}"
+    result['cover_embedded'] = False
+    result['rewritten'] = False
+    return result
+
+def verify_track(job: Dict, audio_hash_before: Optional[str]) -> Tuple[List[str], Optional[str]]:
+    """Re-reads a freshly written file and checks it against its job.
+
+    The tags (and, where one is embedded, the cover hash) must match what
+    was requested, and the audio payload hash must equal the one taken just
+    before the save. Returns (problems, audio hash after the write); no
+    problems means the write is verified.
+    """
+    problems = []
+    kind = get_file_kind(job['path'])
+    desired = build_tag_values(kind, job['title'], job['number'], job['total'], job['album'])
+    try:
+        if not tags_match(read_tags_only(job['path']), kind, desired, job['cover']):
+            problems.append("tags or cover differ from what was written")
+    except Exception as e:
+        problems.append(f"cannot re-read tags ({e})")
+    audio_hash = try_audio_payload_hash(job['path'], kind)
+    if audio_hash_before is not None and audio_hash != audio_hash_before:
+        problems.append("audio data changed" if audio_hash else "audio data can no longer be parsed")
+    return problems, audio_hash
+
+# --- COVER CACHE ---
+# Default size cap of the on-disk cover cache (MB)
+DEFAULT_COVER_CACHE_MB = 512
+
+def open_cover_cache(directory: str, max_mb: int = DEFAULT_COVER_CACHE_MB) -> Dict:
+    """Creates the on-disk cache of processed covers used by --cover-cache."""
+    os.makedirs(directory, exist_ok=True)
+    return {'dir': directory, 'max_bytes': max(max_mb, 0) * 1024 * 1024}
+
+def cover_cache_paths(cache: Dict, source_hash: str, max_px: int, max_kb: int) -> Tuple[str, str]:
+    """Image and JSON sidecar paths of the entry for a source image and processing parameters."""
+    key = hash_bytes(f"{source_hash}:{max_px}:{max_kb}".encode())
+    stem = os.path.join(cache['dir'], key[:2], key)
+    return stem + '.img', stem + '.json'
+
+def cover_cache_get(cache: Dict, source_hash: str, max_px: int, max_kb: int) -> Optional[Tuple[bytes, Dict]]:
+    """Returns the cached (bytes, info) for a cover, or None on a miss or a damaged entry.
+
+    A hit refreshes the entry's mtime, which is what eviction orders by.
+    """
+    image_path, info_path = cover_cache_paths(cache, source_hash, max_px, max_kb)
+    try:
+        with open(info_path, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        with open(image_path, 'rb') as f:
+            data = f.read()
+        os.utime(image_path)
+    except (OSError, ValueError):
+        return None
+    if hash_bytes(data) != info.get('sha256'):
+        return None
+    return data, info
+
+def cover_cache_put(cache: Dict, source_hash: str, max_px: int, max_kb: int, data: bytes, info: Dict) -> None:
+    """Stores a processed cover and its sidecar atomically, then evicts down to the size cap."""
+    image_path, info_path = cover_cache_paths(cache, source_hash, max_px, max_kb)
+    os.makedirs(os.path.dirname(image_path), exist_ok=True)
+    info = dict(info, sha256=hash_bytes(data), bytes=len(data), source_sha256=source_hash,
+                max_px=max_px, max_kb=max_kb)
+    # The sidecar goes first: an image without its sidecar is never served
+    for path, payload in ((info_path, json.dumps(info).encode()), (image_path, data)):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+    evict_cover_cache(cache)
+
+def evict_cover_cache(cache: Dict) -> int:
+    """Deletes least recently used entries until the cache fits its cap. Returns the count removed."""
+    entries = []
+    total = 0
+    for bucket in os.scandir(cache['dir']):
+        if not bucket.is_dir():
+            continue
+        for entry in os.scandir(bucket.path):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            total += st.st_size
+            if entry.name.endswith('.img'):
+                entries.append((st.st_mtime_ns, entry.path))
+
+    removed = 0
+    for _, image_path in sorted(entries):
+        if total <= cache['max_bytes']:
+            break
+        for path in (image_path, image_path[:-len('.img')] + '.json'):
+            try:
+                total -= os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                pass
+        removed += 1
+    return removed
+
+def cached_shrink_cover_art(
+    data: bytes,
+    cover_limits: Dict[str, int],
+    cache: Optional[Dict] = None,
+    log: Callable[[str], None] = print
+) -> Tuple[bytes, Optional[bool]]:
+    """shrink_cover_art behind the on-disk cover cache.
+
+    Returns the embeddable bytes and whether the cache was hit (None when
+    no cache is configured or nothing could be cached).
+    """
+    if cache is None:
+        return shrink_cover_art(data, log=log, **cover_limits), None
+
+    source_hash = hash_bytes(data)
+    max_px, max_kb = cover_limits.get('max_px', 0), cover_limits.get('max_kb', 0)
+    hit = cover_cache_get(cache, source_hash, max_px, max_kb)
+    if hit is not None:
+        return hit[0], True
+
+    result = shrink_cover_art(data, log=log, source_hash=source_hash, **cover_limits)
+    try:
+        from PIL import Image
+
+        with Image.open(io.BytesIO(result)) as image:
+            info = {'mime': determine_mime_type('', result), 'width': image.size[0], 'height': image.size[1]}
+        cover_cache_put(cache, source_hash, max_px, max_kb, result, info)
+    except Exception as e:
+        # Without Pillow (or for an unreadable image) nothing was processed, so nothing is cached
+        if not isinstance(e, ImportError):
+            log(f"  ⚠️ Unable to cache cover art ({e}).")
+        return result, None
+    return result, False
+
+# --- STATE STORE ---
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    audio_hash TEXT,
+    tags TEXT NOT NULL,
+    cover_hash TEXT,
+    updated_at TEXT NOT NULL
+)
+"""
+
+def open_state_db(db_path: str) -> 'sqlite3.Connection':
+    """Opens (and creates if needed) the per-library state database.
+
+    One row per file records the stat fingerprint seen right after the tool
+    last wrote or verified it, together with the tag set and cover hash that
+    were applied, so later runs can skip the file without opening it.
+    """
+    import sqlite3
+
+    # Session mode writes from its tagging thread; only one thread uses the connection at a time
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(STATE_SCHEMA)
+    conn.commit()
+    return conn
+
+def serialize_tag_values(desired: Dict[str, list]) -> str:
+    """Stable text form of a desired tag set for storage and comparison."""
+    return json.dumps(desired, sort_keys=True, ensure_ascii=False)
+
+def state_is_current(
+    conn: 'sqlite3.Connection',
+    file_path: str,
+    st: os.stat_result,
+    tags_text: str,
+    cover_hash: Optional[str]
+) -> bool:
+    """True when the file is exactly as the tool last left it and the wanted tags are the same."""
+    row = conn.execute(
+        "SELECT size, mtime_ns, inode, tags, cover_hash FROM files WHERE path = ?",
+        (file_path,)
+    ).fetchone()
+    return row is not None and row == (st.st_size, st.st_mtime_ns, st.st_ino, tags_text, cover_hash)
+
+def record_state(
+    conn: 'sqlite3.Connection',
+    file_path: str,
+    st: os.stat_result,
+    tags_text: str,
+    cover_hash: Optional[str],
+    audio_hash: Optional[str] = None
+) -> None:
+    """Stores the post-write fingerprint and applied tags for a file.
+
+    ``audio_hash`` replaces the stored audio payload hash; without one the
+    previous value is kept.
+    """
+    conn.execute(
+        "INSERT OR REPLACE INTO files (path, size, mtime_ns, inode, audio_hash, tags, cover_hash, updated_at) "
+        "VALUES (?, ?, ?, ?, COALESCE(?, (SELECT audio_hash FROM files WHERE path = ?)), ?, ?, ?)",
+        (file_path, st.st_size, st.st_mtime_ns, st.st_ino, audio_hash, file_path,
+         tags_text, cover_hash, datetime.now().isoformat(timespec='seconds'))
+    )
+
+# --- RUN JOURNAL ---
+def open_journal(journal_path: str, resume: bool = False) -> TextIO:
+    """Opens the write-ahead journal: appended to when resuming, started fresh otherwise.
+
+    main refuses to start fresh over a journal that still has unfinished writes.
+    """
+    journal = open(journal_path, 'a' if resume else 'w', encoding='utf-8')
+    if resume and journal.tell():
+        # A killed run can leave half a record behind; start on a fresh line
+        journal.write('\n')
+    return journal
+
+def journal_plan(
+    journal: TextIO,
+    jobs: List[Dict],
+    album: Album,
     cover_art_path: Optional[str],
     mime_type: Optional[str]
 ) -> None:
-    """Applies all gathered metadata and cover art to the audio files."""
-    print("\n--- APPLYING TAGS ---")
-    
-    total_tracks = len(tracklist)
-    embed_cover = bool(cover_art_path and mime_type)
-    
-    for i, (file_name, track_title) in enumerate(tracklist):
-        track_number = i + 1
-        file_path = os.path.join(os.getcwd(), file_name)
-        
+    """Logs every planned write of an album and forces it to disk before tagging starts.
+
+    Each record carries everything needed to redo the write without the
+    manifest or prompts: path, title, numbering, album metadata and cover.
+    """
+    album_id = os.urandom(16).hex()
+    album_meta = album.as_dict()
+    for job in jobs:
+        journal.write(json.dumps({
+            'op': 'plan',
+            'album': album_id,
+            'path': os.path.abspath(job['path']),
+            'title': job['title'],
+            'number': job['number'],
+            'total': job['total'],
+            'meta': album_meta,
+            'cover': cover_art_path,
+            'mime': mime_type,
+        }, ensure_ascii=False) + '\n')
+    journal.flush()
+    os.fsync(journal.fileno())
+
+def journal_done(journal: TextIO, file_path: str) -> None:
+    """Marks a planned write as finished."""
+    journal.write(json.dumps({'op': 'done', 'path': os.path.abspath(file_path)}, ensure_ascii=False) + '\n')
+    journal.flush()
+
+def load_journal_pending(journal_path: str) -> List[Tuple[str, List[Dict], Dict]]:
+    """Returns the planned writes that never got a matching 'done' record.
+
+    Records are grouped back into their albums, in journal order, as
+    (directory, plan records, first plan record) tuples. A truncated last
+    line (the run died mid-write) is ignored.
+    """
+    pending: Dict[str, Dict] = {}
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('op') == 'plan':
+                pending.pop(record['path'], None)
+                pending[record['path']] = record
+            elif record.get('op') == 'done':
+                pending.pop(record['path'], None)
+
+    albums: Dict[str, List[Dict]] = {}
+    for record in pending.values():
+        albums.setdefault(record['album'], []).append(record)
+    return [
+        (os.path.dirname(records[0]['path']), records, records[0])
+        for records in albums.values()
+    ]
+
+# --- PREFETCH ---
+def stat_key(st: os.stat_result) -> Tuple[int, int, int]:
+    """The parts of a stat result that change when a file is rewritten."""
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+# Embedded picture bytes the prefetcher may hold in parsed handlers; past it, tracks are only read ahead
+PREFETCH_MAX_PICTURE_BYTES = 64 * 1024 * 1024
+
+def prefetch_album(
+    directory: str,
+    track_files: List[str],
+    cover_files: List[str],
+    keep_handlers: bool = True,
+    max_picture_bytes: int = PREFETCH_MAX_PICTURE_BYTES
+) -> Dict[str, Dict]:
+    """Opens every track and reads every cover candidate of an album ahead of tagging.
+
+    Meant to run on a background thread while the operator answers prompts.
+    Returns ``{'tracks': {...}, 'covers': {...}}`` keyed by absolute path,
+    each entry holding the file's stat key from before it was read and the
+    parsed handler (tracks) or raw bytes (covers). With ``keep_handlers``
+    False the tracks are only parsed (which pulls their tags into the OS
+    cache for pool workers) and nothing is kept. Handlers carry their
+    embedded pictures, so once the kept ones hold ``max_picture_bytes`` of
+    them the remaining tracks are parsed but not kept, and tagging reopens
+    them. Cover candidates share a budget of the same size: they are read
+    best-named first and any that would not fit is left for tagging to
+    read. Unreadable files are left out; tagging reports them when it opens
+    them itself.
+    """
+    cache: Dict[str, Dict] = {'tracks': {}, 'covers': {}}
+    picture_bytes = 0
+    for file_name in track_files:
+        path = os.path.abspath(os.path.join(directory, file_name))
         try:
-            audio = get_file_handler(file_path)
-            if audio is None:
-                print(f"  [SKIPPED] Cannot handle file type for {file_name}")
+            st = os.stat(path)
+            if not keep_handlers or picture_bytes > max_picture_bytes:
+                read_tags_only(path)
                 continue
+            audio = get_file_handler(path)
+            picture_bytes += embedded_picture_bytes(audio, get_file_kind(path))
+            if picture_bytes <= max_picture_bytes:
+                cache['tracks'][path] = {'stat': stat_key(st), 'value': audio}
+        except Exception:
+            continue
 
-            print(f"  [{track_number}/{total_tracks}] Tagging: {track_title}...")
-            
-            # Use 'tags' property for FLAC/MP4, or ID3 directly for MP3
-            
-            if isinstance(audio, MP3):
-                audio.delete() # Clear existing tags for clean application
-                audio.add_tags()
-                tags = audio.tags
-                tags.add(TPE1(encoding=3, text=[album_meta['artist']]))
-                tags.add(TIT2(encoding=3, text=[track_title]))
-                tags.add(TALB(encoding=3, text=[album_meta['title']]))
-                tags.add(TCON(encoding=3, text=[album_meta['genre']]))
-                tags.add(TRCK(encoding=3, text=[f"{track_number}/{total_tracks}"]))
-                tags.add(TDRC(encoding=3, text=[album_meta['year']]))
-                
-                if embed_cover:
-                    with open(cover_art_path, 'rb') as f:
-                        tags.add(APIC(
-                            encoding=3,
-                            mime=mime_type,
-                            type=3, # 3 is Front Cover
-                            desc=u'Cover',
-                            data=f.read()
-                        ))
-            
-            elif isinstance(audio, (FLAC, MP4)):
-                if audio.tags is None:
-                    audio.add_tags()
-                tags = audio.tags
-                tags['artist'] = [album_meta['artist']]
-                tags['title'] = [track_title]
-                tags['album'] = [album_meta['title']]
-                tags['genre'] = [album_meta['genre']]
-                tags['tracknumber'] = [str(track_number)]
-                tags['date'] = [album_meta['year']]
-
-                if isinstance(audio, FLAC) and embed_cover:
-                    from mutagen.flac import Picture
-                    image = Picture()
-                    image.type = 3
-                    image.mime = mime_type
-                    with open(cover_art_path, 'rb') as f:
-                        image.data = f.read()
-                    audio.add_picture(image)
-                
-            audio.save()
-            
-        except error as e:
-            print(f"  [ERROR] Mutagen error on {file_name}: {e}")
+    cover_bytes = 0
+    for file_name in sorted(cover_files, key=cover_name_hint, reverse=True):
+        path = os.path.abspath(os.path.join(directory, file_name))
+        try:
+            st = os.stat(path)
+            if cover_bytes + st.st_size > max_picture_bytes:
+                continue
+            with open(path, 'rb') as f:
+                cache['covers'][path] = {'stat': stat_key(st), 'value': f.read()}
+            cover_bytes += st.st_size
+        except OSError:
+            continue
+    return cache
+
+def take_prefetched(cache: Optional[Dict[str, Dict]], file_path: str):
+    """Pops the prefetched value for ``file_path``, or None if missing or the file changed since."""
+    if not cache:
+        return None
+    entry = cache.pop(os.path.abspath(file_path), None)
+    if entry is None:
+        return None
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return entry['value'] if stat_key(st) == entry['stat'] else None
+
+def apply_tags(
+    tracklist: List[Track],
+    album: Album,
+    cover_art_path: Optional[str],
+    mime_type: Optional[str],
+    directory: Optional[str] = None,
+    executor: Optional['Executor'] = None,
+    skip_unchanged: bool = True,
+    padding_kb: int = DEFAULT_PADDING_KB,
+    state_db: Optional['sqlite3.Connection'] = None,
+    journal: Optional[TextIO] = None,
+    total_tracks: Optional[int] = None,
+    profile: Optional[Dict] = None,
+    prefetched: Optional[Dict[str, Dict]] = None,
+    cover_limits: Optional[Dict[str, int]] = None,
+    cover_cache: Optional[Dict] = None,
+    hash_audio: bool = False,
+    verify: bool = False,
+    failures: Optional[List[Tuple[str, str]]] = None,
+    log: Callable[[str], None] = print,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, int]:
+    """Applies the album's metadata and cover art to every track and returns outcome counts.
+
+    Tracks are resolved against ``directory`` (default: the working folder)
+    and numbered by position unless they carry a ``number``. Files whose
+    tags already match are left alone unless ``skip_unchanged`` is False.
+    Work fans out over ``executor``; results are reported in tracklist order
+    through ``log``, or through ``progress(done, total)`` when given. The
+    remaining keywords are the tagging options built by tagging_options:
+    state database, journal, padding, cover limits and cache, audio hashing,
+    verification and profiling. Files that fail to write or verify are added
+    to ``failures`` as (path, reason).
+    """
+    if progress is None:
+        log("\n--- APPLYING TAGS ---")
+
+    base_dir = directory or os.getcwd()
+    if total_tracks is None:
+        total_tracks = len(tracklist)
+    stats = {
+        'written': 0, 'unchanged': 0, 'cached': 0, 'skipped': 0, 'failed': 0, 'rewritten': 0,
+        'cover_bytes_read': 0, 'cover_bytes_saved': 0, 'cover_cache_hits': 0, 'cover_cache_misses': 0,
+        'verified': 0, 'verify_failed': 0,
+    }
+
+    cover = None
+    if cover_art_path and mime_type:
+        try:
+            started = time.perf_counter()
+            kinds = {get_file_kind(track.file_name) for track in tracklist}
+            cover_data = take_prefetched(prefetched and prefetched['covers'], cover_art_path)
+            if cover_data is None:
+                with open(cover_art_path, 'rb') as f:
+                    cover_data = f.read()
+            profile_add(profile, 'cover_read', time.perf_counter() - started, len(cover_data))
+            stats['cover_bytes_read'] = len(cover_data)
+            if cover_limits:
+                with profiled(profile, 'cover_shrink'):
+                    cover_data, cache_hit = cached_shrink_cover_art(cover_data, cover_limits, cover_cache, log)
+                if cache_hit is not None:
+                    stats['cover_cache_hits' if cache_hit else 'cover_cache_misses'] += 1
+            cover = prepare_cover_art(
+                cover_art_path, determine_mime_type(cover_art_path, cover_data), kinds, cover_data
+            )
+        except OSError as e:
+            log(f"  ⚠️ Unable to read cover art ({e}). Skipping cover art.")
+
+    jobs = [
+        {
+            'file_name': track.file_name,
+            'path': os.path.join(base_dir, track.file_name),
+            'title': track.title,
+            'number': track.number or position,
+            'total': total_tracks,
+            'album': album,
+            'cover': cover,
+            'skip_unchanged': skip_unchanged,
+            'padding_kb': padding_kb,
+            'profile': profile is not None,
+            'hash_audio': hash_audio and state_db is not None,
+            'verify': verify,
+        }
+        for position, track in enumerate(tracklist, start=1)
+    ]
+
+    cover_hash = cover['sha256'] if cover else None
+    if state_db is not None:
+        for job in jobs:
+            kind = get_file_kind(job['path'])
+            if kind is None:
+                continue
+            job['state_path'] = os.path.abspath(job['path'])
+            job['state_tags'] = serialize_tag_values(
+                build_tag_values(kind, job['title'], job['number'], job['total'], album)
+            )
+            try:
+                st = os.stat(job['state_path'])
+            except OSError:
+                continue
+            job['cached'] = skip_unchanged and state_is_current(
+                state_db, job['state_path'], st, job['state_tags'], cover_hash
+            )
+
+    if journal is not None:
+        journal_plan(journal, jobs, album, cover_art_path, mime_type)
+
+    if prefetched and executor is None:
+        # Parsed handlers stay in this process; pool workers reopen the (now cached) files
+        for job in jobs:
+            if not job.get('cached'):
+                job['audio'] = take_prefetched(prefetched['tracks'], job['path'])
+
+    def settle(job: Dict, result: Dict) -> None:
+        """Records a track whose outcome is final in the failure list, state database and journal."""
+        if result['outcome'] == 'failed' and failures is not None:
+            failures.append((job['path'], result['message'].strip()))
+        if state_db is not None and result['outcome'] in ('written', 'unchanged') and 'state_path' in job:
+            try:
+                record_state(state_db, job['state_path'], os.stat(job['state_path']),
+                             job['state_tags'], cover_hash, result.get('audio_hash'))
+            except OSError:
+                pass
+        if journal is not None and result['outcome'] != 'failed':
+            journal_done(journal, job['path'])
+
+    def settle_verified(job: Dict, result: Dict, future) -> None:
+        problems, result['audio_hash'] = future.result()
+        stats['verified'] += 1
+        if problems:
+            stats['verify_failed'] += 1
+            # The write happened but cannot be trusted: count the file as failed, not written
+            stats['written'] -= 1
+            stats['failed'] += 1
+            result = dict(result, outcome='failed', message=f"Verification failed: {'; '.join(problems)}")
+            log(f"  [VERIFY FAILED] {job['file_name']}: {'; '.join(problems)}")
+        settle(job, result)
+
+    verifier = None
+    if verify:
+        from concurrent.futures import ThreadPoolExecutor
+        verifier = ThreadPoolExecutor(max_workers=VERIFY_THREADS)
+    verifying: deque = deque()
+
+    embedded = 0
+    pending = [job for job in jobs if not job.get('cached')]
+    cover_file = None
+    if executor is not None and cover and pending:
+        # Pickling the cover into every job would ship it once per track; spill it for the workers instead
+        import tempfile
+        fd, cover_file = tempfile.mkstemp(prefix='album-cover-', suffix='.bin')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(cover['data'])
+        cover_ref = {
+            'sha256': cover['sha256'], 'file': cover_file, 'mime': cover['mime'],
+            'kinds': [kind for kind, key in (('mp3', 'apic'), ('flac', 'picture')) if key in cover],
+        }
+        pending = [dict(job, cover=None, cover_ref=cover_ref) for job in pending]
+    results = iter(executor.map(tag_track, pending) if executor else map(tag_track, pending))
+    try:
+        for done, job in enumerate(jobs, start=1):
+            if job.get('cached'):
+                result = {'outcome': 'cached', 'message': '', 'cover_embedded': False, 'rewritten': False}
+            else:
+                result = next(results)
+            if progress is not None:
+                progress(done, len(jobs))
+            elif result['outcome'] in ('unchanged', 'cached'):
+                log(f"  [{job['number']}/{total_tracks}] Unchanged: {job['title']}")
+            elif result['outcome'] != 'skipped':
+                log(f"  [{job['number']}/{total_tracks}] Tagging: {job['title']}...")
+            if result['message']:
+                log(result['message'])
+            stats[result['outcome']] += 1
+            stats['rewritten'] += result['rewritten']
+            profile_file(profile, job['path'], result.get('profile'))
+            embedded += result['cover_embedded']
+            if verifier is not None and result['outcome'] == 'written':
+                verifying.append((job, result, verifier.submit(
+                    verify_track, job, result.get('audio_hash_before')
+                )))
+            else:
+                settle(job, result)
+            while verifying and verifying[0][2].done():
+                settle_verified(*verifying.popleft())
+        while verifying:
+            settle_verified(*verifying.popleft())
+    finally:
+        if verifier is not None:
+            verifier.shutdown()
+        if cover_file is not None:
+            os.remove(cover_file)
+
+    if state_db is not None:
+        state_db.commit()
+
+    if cover and embedded > 1:
+        # Each embedding used to re-read the image from disk
+        stats['cover_bytes_saved'] = len(cover['data']) * (embedded - 1)
+
+    return stats
+
+def format_bytes(count: int) -> str:
+    """Human readable byte count for summaries."""
+    size = float(count)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{count} B"
+
+def print_tag_stats(stats: Dict[str, int]) -> None:
+    """Prints the per-track outcome counters shared by every summary."""
+    print(f"Written  : {stats.get('written', 0)}")
+    print(f"Unchanged: {stats.get('unchanged', 0) + stats.get('cached', 0)}"
+          f" ({stats.get('cached', 0)} skipped via state db without opening)")
+    print(f"Skipped  : {stats.get('skipped', 0)}")
+    print(f"Failed   : {stats.get('failed', 0)}")
+    print(f"Full rewrites: {stats.get('rewritten', 0)} (other writes updated tags in place)")
+    print(
+        f"Cover reads: {format_bytes(stats.get('cover_bytes_read', 0))} "
+        f"(saved {format_bytes(stats.get('cover_bytes_saved', 0))} of repeated reads)"
+    )
+    if stats.get('cover_cache_hits') or stats.get('cover_cache_misses'):
+        print(f"Cover cache: {stats.get('cover_cache_hits', 0)} hit(s), "
+              f"{stats.get('cover_cache_misses', 0)} miss(es)")
+    if stats.get('verified'):
+        print(f"Verified : {stats['verified']} ({stats.get('verify_failed', 0)} failed verification)")
+
+def print_failures(failures: Optional[List[Tuple[str, str]]]) -> None:
+    """Lists every file that failed to write or verify, one per line."""
+    if not failures:
+        return
+    print(f"\n--- FAILED FILES ({len(failures)}) ---")
+    for file_path, reason in failures:
+        print(f"  {file_path}: {reason}")
+
+def create_executor(workers: int) -> Optional['Executor']:
+    """Returns a process pool for ``workers`` > 1, or None to tag in-process."""
+    if workers <= 1:
+        return None
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(max_workers=workers)
+
+def bounded_map(
+    fn: Callable,
+    items,
+    executor: Optional['Executor'] = None,
+    window: int = 64,
+    ordered: bool = True
+) -> Iterator:
+    """Like ``executor.map`` but consumes ``items`` lazily.
+
+    At most ``window`` calls are in flight, so a generator such as
+    walk_library can feed a pool without being read to the end first.
+    Results come back in input order, or as soon as each finishes when
+    ``ordered`` is False (one slow call then holds nothing back). Without
+    an executor it is plain map().
+    """
+    if executor is None:
+        yield from map(fn, items)
+        return
+    if not ordered:
+        from concurrent.futures import FIRST_COMPLETED, wait
+        running = set()
+        for item in items:
+            running.add(executor.submit(fn, item))
+            if len(running) >= window:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        return
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+# --- BATCH MODE ---
+# Manifest columns understood by the headless batch mode
+MANIFEST_FIELDS = ['path', 'title', 'album', 'artist', 'genre', 'year', 'cover']
+
+def load_manifest(manifest_path: str) -> List[Dict[str, str]]:
+    """Reads a JSON or CSV manifest into a list of normalized rows.
+
+    JSON manifests may be a list of objects or an object with an ``albums``
+    list. CSV manifests need a header row. Keys are lower-cased and values are
+    stripped strings; relative paths are resolved against the manifest folder.
+    """
+    if manifest_path.lower().endswith('.json'):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('albums', [])
+        if not isinstance(data, list):
+            raise ValueError("JSON manifest must be a list of rows or contain an 'albums' list.")
+    else:
+        with open(manifest_path, 'r', encoding='utf-8-sig', newline='') as f:
+            data = list(csv.DictReader(f))
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    rows = []
+    for number, raw in enumerate(data, start=1):
+        if not isinstance(raw, dict):
+            raise ValueError(f"Manifest row {number} is not an object with named fields.")
+        row = {
+            str(key).strip().lower(): str(value).strip()
+            for key, value in raw.items()
+            if key is not None and value is not None
+        }
+        for key in ('path', 'cover'):
+            if row.get(key):
+                row[key] = os.path.join(base_dir, os.path.expanduser(row[key]))
+        rows.append(row)
+    return rows
+
+def detect_cover_art(directory: str) -> Tuple[Optional[str], Optional[str]]:
+    """Non-interactive cover lookup: the best ranked valid image of the folder, if any."""
+    images = rank_cover_candidates(directory, list_cover_candidates(directory))
+    if not images:
+        return None, None
+    file_name, info = images[0]
+    if len(images) > 1:
+        print(f"  🖼️ Picked {file_name} ({describe_image(info)}) from {len(images)} candidate images.")
+    return os.path.join(directory, file_name), info['mime']
+
+def plan_manifest_albums(
+    rows: List[Dict[str, str]]
+) -> Iterator[Tuple[str, List[Track], Album, Optional[str]]]:
+    """Turns manifest rows into albums ready for apply_tags, lazily.
+
+    A row whose path is a folder describes a whole album: ``title`` is the
+    album title and the folder is walked with walk_library, so every folder
+    below it that holds audio (e.g. CD1/CD2 of a box set) is tagged with the
+    row's values, files in name order. Albums are yielded as the walk finds
+    them, so tagging starts before a large tree has been read. A row whose
+    path is a file describes one track (``title`` is the track title,
+    ``album`` the album title); consecutive track rows of one folder form an
+    album and keep manifest order. Album-wide values fall back to the
+    interactive defaults. Every row's path is checked before anything is
+    yielded; a missing one raises ValueError. Yields (directory, tracklist,
+    album, cover_path) tuples.
+    """
+    for row in rows:
+        path = row.get('path')
+        if not path:
+            raise ValueError(f"Manifest row without a path: {row}")
+        if not os.path.exists(path):
+            raise ValueError(f"Manifest path does not exist: {path}")
+    return iter_manifest_albums(rows)
+
+def iter_manifest_albums(rows: List[Dict[str, str]]) -> Iterator[Tuple[str, List[Track], Album, Optional[str]]]:
+    """The generator behind plan_manifest_albums (rows already validated)."""
+    current_year = str(datetime.now().year)
+
+    def planned(directory: str, tracklist: List[Track], fields: Dict[str, str]):
+        album = Album(
+            fields.get('album') or infer_album_title(directory),
+            fields.get('artist') or DEFAULT_ARTIST,
+            fields.get('genre') or DEFAULT_GENRE,
+            fields.get('year') or current_year,
+        )
+        return directory, tracklist, album, fields.get('cover') or None
+
+    pending: Optional[Tuple[str, List[Track], Dict[str, str]]] = None
+    for row in rows:
+        path = os.path.normpath(row['path'])
+        if os.path.isdir(path):
+            if pending:
+                yield planned(*pending)
+                pending = None
+            album_fields = dict(row, album=row.get('title', ''))
+            found = False
+            for directory, audio, _ in walk_library(path):
+                found = True
+                tracklist = [Track(file_name, os.path.splitext(file_name)[0]) for file_name, _ in audio]
+                yield planned(directory, tracklist, album_fields)
+            if not found:
+                # Reported as skipped by the caller
+                yield planned(path, [], album_fields)
+            continue
+
+        directory, file_name = os.path.split(path)
+        if pending and pending[0] != directory:
+            yield planned(*pending)
+            pending = None
+        if pending is None:
+            pending = (directory, [], {})
+        track_title = row.get('title') or os.path.splitext(file_name)[0]
+        pending[1].append(Track(file_name, track_title))
+        for key in ('album', 'artist', 'genre', 'year', 'cover'):
+            if row.get(key) and not pending[2].get(key):
+                pending[2][key] = row[key]
+    if pending:
+        yield planned(*pending)
+
+def run_batch(manifest_path: str, workers: int = 1, tag_options: Optional[Dict] = None) -> int:
+    """Tags every album described by a manifest without prompting."""
+    started = time.perf_counter()
+    print("---------------------------------------")
+    print("🚀 AEiOU'S ALBUM METADATA MANAGER v1.0 — BATCH MODE")
+    print(f"Manifest: {manifest_path}")
+    print(f"Session Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("---------------------------------------")
+
+    tag_options = tag_options or {}
+    try:
+        with profiled(tag_options.get('profile'), 'manifest'):
+            albums = plan_manifest_albums(load_manifest(manifest_path))
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"❌ Could not read manifest: {e}")
+        return 2
+
+    executor = create_executor(workers)
+    totals: Dict[str, int] = {}
+    album_count = 0
+    try:
+        # Folder rows are walked as albums are tagged, so the total is only known at the end
+        for album_count, (directory, tracklist, album, cover_art_path) in enumerate(albums, start=1):
+            print(f"\n=== [{album_count}] {album.title} ({directory}) ===")
+            if not tracklist:
+                print("  [SKIPPED] No supported audio files found.")
+                continue
+
+            if cover_art_path:
+                info = probe_image(cover_art_path)
+                if info['error']:
+                    print(f"  ⚠️ Cover art not usable: {cover_art_path} ({info['error']}). Skipping cover art.")
+                    cover_art_path = None
+                mime_type = info['mime'] if cover_art_path else None
+            else:
+                cover_art_path, mime_type = detect_cover_art(directory)
+
+            with profiled(tag_options.get('profile'), 'apply_tags'):
+                stats = apply_tags(
+                    tracklist, album, cover_art_path, mime_type,
+                    directory=directory, executor=executor, **tag_options
+                )
+            for key, count in stats.items():
+                totals[key] = totals.get(key, 0) + count
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return finish_batch(album_count, totals, started, tag_options.get('failures'))
+
+def finish_batch(
+    album_count: int,
+    totals: Dict[str, int],
+    started: float,
+    failures: Optional[List[Tuple[str, str]]] = None
+) -> int:
+    """Prints the end-of-run summary for headless runs and returns the exit code."""
+    elapsed = time.perf_counter() - started
+    print("\n--- BATCH SUMMARY ---")
+    print(f"Albums   : {album_count}")
+    print_tag_stats(totals)
+    print(f"Elapsed  : {elapsed:.1f}s")
+    print_failures(failures)
+
+    if totals.get('failed'):
+        print("\n⚠️ Batch finished with errors. See the log above for details.")
+        return 1
+    print("\n✅ Batch complete.")
+    return 0
+
+def run_resume(journal_path: str, workers: int = 1, tag_options: Optional[Dict] = None) -> int:
+    """Replays the writes an interrupted run planned but never finished."""
+    started = time.perf_counter()
+    print("---------------------------------------")
+    print("🚀 AEiOU'S ALBUM METADATA MANAGER v1.0 — RESUME")
+    print(f"Journal: {journal_path}")
+    print("---------------------------------------")
+
+    tag_options = tag_options or {}
+    try:
+        with profiled(tag_options.get('profile'), 'journal'):
+            albums = load_journal_pending(journal_path)
+    except OSError as e:
+        print(f"❌ Could not read journal: {e}")
+        return 2
+    if not albums:
+        print("✅ Nothing left to do: every planned write was completed.")
+        return 0
+
+    executor = create_executor(workers)
+    totals: Dict[str, int] = {}
+    try:
+        for index, (directory, records, first) in enumerate(albums, start=1):
+            print(f"\n=== [{index}/{len(albums)}] {first['meta']['title']} ({directory}): "
+                  f"{len(records)} track(s) remaining ===")
+            cover_art_path, mime_type = first['cover'], first['mime']
+            if cover_art_path and not os.path.isfile(cover_art_path):
+                print(f"  ⚠️ Cover art not found: {cover_art_path}. Skipping cover art.")
+                cover_art_path = mime_type = None
+
+            with profiled(tag_options.get('profile'), 'apply_tags'):
+                stats = apply_tags(
+                    [Track(os.path.basename(record['path']), record['title'], record['number'])
+                     for record in records],
+                    Album.from_dict(first['meta']), cover_art_path, mime_type,
+                    directory=directory, executor=executor,
+                    total_tracks=first['total'],
+                    **tag_options
+                )
+            for key, count in stats.items():
+                totals[key] = totals.get(key, 0) + count
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return finish_batch(len(albums), totals, started, tag_options.get('failures'))
+
+# --- PICTURE DEDUPE ---
+def dedupe_flac_pictures(job: Tuple[str, bool, int]) -> Dict:
+    """Removes byte-identical PICTURE blocks from one FLAC file.
+
+    ``job`` is (path, dry_run, padding_bytes). The first copy of each picture
+    is kept. The file is saved with ``padding_bytes`` of padding so the space
+    the duplicates took is actually given back. Returns the path, the number
+    of pictures removed, the bytes they used and an error message, if any.
+    """
+    from mutagen.flac import FLAC, Picture
+
+    file_path, dry_run, padding_bytes = job
+    result = {'path': file_path, 'removed': 0, 'bytes': 0, 'error': ''}
+    try:
+        audio = FLAC(file_path)
+        seen = set()
+        blocks = []
+        for block in audio.metadata_blocks:
+            if isinstance(block, Picture):
+                key = (block.type, hash_bytes(block.data))
+                if key in seen:
+                    result['removed'] += 1
+                    result['bytes'] += len(block.data)
+                    continue
+                seen.add(key)
+            blocks.append(block)
+        if result['removed'] and not dry_run:
+            audio.metadata_blocks = blocks
+            audio.save(padding=lambda info: padding_bytes)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+def run_dedupe_pictures(root: str, workers: int = 1, dry_run: bool = False,
+                        padding_kb: int = DEFAULT_PADDING_KB) -> int:
+    """Strips duplicated embedded pictures from every FLAC file below ``root``."""
+    print("---------------------------------------")
+    print("🧹 DEDUPE EMBEDDED PICTURES" + (" (dry run)" if dry_run else ""))
+    print(f"Library: {root}")
+    print("---------------------------------------")
+
+    jobs = (
+        (os.path.join(directory, file_name), dry_run, padding_kb * 1024)
+        for directory, audio, _ in walk_library(root)
+        for file_name, _ in audio
+        if get_file_kind(file_name) == 'flac'
+    )
+    executor = create_executor(workers)
+    scanned = cleaned = removed = reclaimed = failed = 0
+    try:
+        for result in bounded_map(dedupe_flac_pictures, jobs, executor, window=workers * 4):
+            scanned += 1
+            if result['error']:
+                failed += 1
+                print(f"  [ERROR] {result['path']}: {result['error']}")
+            elif result['removed']:
+                cleaned += 1
+                removed += result['removed']
+                reclaimed += result['bytes']
+                print(f"  [DEDUPED] {result['path']}: {result['removed']} duplicate picture(s), "
+                      f"{format_bytes(result['bytes'])}")
+    finally:
+        if executor:
+            executor.shutdown()
+
+    print("\n--- DEDUPE SUMMARY ---")
+    print(f"FLAC files scanned : {scanned}")
+    print(f"Files with dupes   : {cleaned}")
+    print(f"Pictures removed   : {removed}")
+    print(f"Space reclaimed    : {format_bytes(reclaimed)}" + (" (dry run, nothing written)" if dry_run else ""))
+    print(f"Failed             : {failed}")
+    return 1 if failed else 0
+
+# --- LIBRARY AUDIT ---
+# Columns of the audit report, in order (list values are joined with ' | ' in CSV)
+AUDIT_FIELDS = [
+    'directory', 'files', 'issues', 'artists', 'albums', 'years', 'missing_cover', 'covers',
+    'missing_tracks', 'duplicate_tracks', 'unnumbered', 'duplicate_pictures', 'errors',
+]
+
+def first_number(value) -> Optional[int]:
+    """The leading number of a track/disc value such as '3', '3/12' or (3, 12)."""
+    if isinstance(value, tuple):
+        value = value[0]
+    try:
+        return int(str(value).split('/')[0].strip()) or None
+    except ValueError:
+        return None
+
+def total_number(value) -> Optional[int]:
+    """The total part of a track value such as '3/12' or (3, 12)."""
+    if isinstance(value, tuple):
+        return value[1] or None
+    parts = str(value).split('/')
+    return first_number(parts[1]) if len(parts) > 1 else None
+
+def tag_summary(audio, kind: str) -> Dict:
+    """Reduces a loaded file to the few values the audit compares.
+
+    Returns title, artist, album, genre and year strings, the raw track and
+    disc values and one (picture type, sha256) pair per embedded picture.
+    """
+    summary = {
+        'title': '', 'artist': '', 'album': '', 'genre': '', 'year': '',
+        'track': None, 'disc': None, 'pictures': [],
+    }
+    tags = audio.tags
+    if tags is None:
+        return summary
+
+    def text(key: str) -> str:
+        value = tags.get(key)
+        if value is None:
+            return ''
+        values = value.text if kind == 'mp3' else value
+        return '; '.join(str(item) for item in values)
+
+    if kind == 'mp3':
+        summary.update(title=text('TIT2'), artist=text('TPE1'), album=text('TALB'),
+                       genre=text('TCON'), year=text('TDRC')[:4],
+                       track=text('TRCK') or None, disc=text('TPOS') or None)
+        summary['pictures'] = [(frame.type, hash_bytes(frame.data)) for frame in tags.getall('APIC')]
+    elif kind == 'flac':
+        summary.update(title=text('title'), artist=text('artist'), album=text('album'),
+                       genre=text('genre'), year=text('date')[:4],
+                       track=text('tracknumber') or None, disc=text('discnumber') or None)
+        if summary['track'] and '/' not in summary['track'] and text('tracktotal'):
+            summary['track'] += '/' + text('tracktotal')
+        summary['pictures'] = [(picture.type, hash_bytes(picture.data)) for picture in audio.pictures]
+    else:
+        summary.update(title=text('\xa9nam'), artist=text('\xa9ART'), album=text('\xa9alb'),
+                       genre=text('\xa9gen'), year=text('\xa9day')[:4])
+        summary['track'] = tags['trkn'][0] if tags.get('trkn') else None
+        summary['disc'] = tags['disk'][0] if tags.get('disk') else None
+        summary['pictures'] = [(3, hash_bytes(bytes(cover))) for cover in tags.get('covr', [])]
+    return summary
+
+def audit_album(job: Tuple[str, List[str]]) -> Dict:
+    """Reads every track of one album folder and reports its inconsistencies.
+
+    ``job`` is (directory, audio file names). Runs on pool workers and only
+    returns the album's findings, never the tag objects, so the report can
+    be streamed for any library size. Nothing is written.
+    """
+    directory, file_names = job
+    artists, albums, years, covers = set(), set(), set(), set()
+    numbers: Dict[Optional[int], List[int]] = {}
+    totals: Dict[Optional[int], int] = {}
+    record = {
+        'directory': directory, 'files': len(file_names), 'missing_cover': 0,
+        'unnumbered': 0, 'duplicate_pictures': 0, 'errors': [],
+    }
+    for file_name in file_names:
+        try:
+            audio = get_file_handler(os.path.join(directory, file_name))
+            summary = tag_summary(audio, get_file_kind(file_name))
         except Exception as e:
-            print(f"  [ERROR] Unexpected error on {file_name}: {e}")
+            record['errors'].append(f"{file_name}: {e}")
+            continue
+
+        artists.add(summary['artist'])
+        albums.add(summary['album'])
+        years.add(summary['year'])
+        hashes = [digest for _, digest in summary['pictures']]
+        if not hashes:
+            record['missing_cover'] += 1
+        else:
+            fronts = [digest for kind, digest in summary['pictures'] if kind == 3]
+            covers.add((fronts or hashes)[0])
+        if len(set(hashes)) < len(hashes):
+            record['duplicate_pictures'] += 1
+
+        disc = first_number(summary['disc']) if summary['disc'] else None
+        number = first_number(summary['track']) if summary['track'] else None
+        if number is None:
+            record['unnumbered'] += 1
+            continue
+        numbers.setdefault(disc, []).append(number)
+        total = total_number(summary['track'])
+        if total:
+            totals[disc] = max(totals.get(disc, 0), total)
+
+    missing, duplicates = [], []
+    for disc in sorted(numbers, key=lambda value: value or 0):
+        label = f"{disc}-" if len(numbers) > 1 and disc else ''
+        seen = numbers[disc]
+        top = max(max(seen), totals.get(disc, 0))
+        missing += [f"{label}{n}" for n in range(1, top + 1) if n not in seen]
+        duplicates += [f"{label}{n}" for n in sorted(set(seen)) if seen.count(n) > 1]
+
+    record.update(
+        artists=sorted(artists), albums=sorted(albums), years=sorted(years), covers=len(covers),
+        missing_tracks=missing, duplicate_tracks=duplicates,
+    )
+    issues = [name for name, found in (
+        ('mixed_artist', len(artists) > 1),
+        ('mixed_album', len(albums) > 1),
+        ('mixed_year', len(years) > 1),
+        ('missing_cover', record['missing_cover']),
+        ('mixed_cover', len(covers) > 1),
+        ('track_gaps', missing),
+        ('duplicate_tracks', duplicates),
+        ('unnumbered', record['unnumbered']),
+        ('duplicate_pictures', record['duplicate_pictures']),
+        ('read_errors', record['errors']),
+    ) if found]
+    record['issues'] = issues
+    return {field: record[field] for field in AUDIT_FIELDS}
+
+def run_audit(root: str, workers: int = 1, output: Optional[str] = None,
+              report_format: Optional[str] = None, issues_only: bool = False) -> int:
+    """Reads the whole library without writing and streams per-album findings as JSON or CSV."""
+    report_format = report_format or ('csv' if output and output.lower().endswith('.csv') else 'json')
+    out = open(output, 'w', encoding='utf-8', newline='') if output else sys.stdout
+    # The report may be going to stdout; keep progress and the summary out of it
+    console = sys.stdout if output else sys.stderr
+    print("---------------------------------------", file=console)
+    print("🔎 LIBRARY AUDIT (read-only)", file=console)
+    print(f"Library: {root}", file=console)
+    print("---------------------------------------", file=console)
+
+    jobs = (
+        (directory, [file_name for file_name, _ in audio])
+        for directory, audio, _ in walk_library(root, log=lambda message: print(message, file=console))
+        if audio
+    )
+    writer = csv.DictWriter(out, fieldnames=AUDIT_FIELDS) if report_format == 'csv' else None
+    if writer:
+        writer.writeheader()
+    elif report_format == 'json':
+        out.write('[')
+
+    executor = create_executor(workers)
+    album_count = file_count = flagged = written = 0
+    issue_counts: Dict[str, int] = {}
+    try:
+        for record in bounded_map(audit_album, jobs, executor, window=max(workers, 1) * 4):
+            album_count += 1
+            file_count += record['files']
+            flagged += bool(record['issues'])
+            for issue in record['issues']:
+                issue_counts[issue] = issue_counts.get(issue, 0) + 1
+            if issues_only and not record['issues']:
+                continue
+            if writer:
+                writer.writerow({
+                    key: ' | '.join(map(str, value)) if isinstance(value, list) else value
+                    for key, value in record.items()
+                })
+            else:
+                out.write((',\n' if written else '\n') + json.dumps(record, ensure_ascii=False))
+            written += 1
+    finally:
+        if executor:
+            executor.shutdown()
+        if not writer:
+            out.write('\n]\n')
+        if output:
+            out.close()
+
+    print("\n--- AUDIT SUMMARY ---", file=console)
+    print(f"Albums scanned : {album_count}", file=console)
+    print(f"Files read     : {file_count}", file=console)
+    print(f"Albums flagged : {flagged}", file=console)
+    for issue, count in sorted(issue_counts.items(), key=lambda item: -item[1]):
+        print(f"  {issue:<18}: {count}", file=console)
+    if output:
+        print(f"\n📄 Report written to {output}", file=console)
+    return 0
+
+# --- LIBRARY INDEX ---
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    title TEXT COLLATE NOCASE,
+    artist TEXT COLLATE NOCASE,
+    album TEXT COLLATE NOCASE,
+    genre TEXT COLLATE NOCASE,
+    year TEXT,
+    track INTEGER,
+    disc INTEGER,
+    duration REAL,
+    bitrate INTEGER,
+    sample_rate INTEGER,
+    channels INTEGER,
+    pictures INTEGER NOT NULL,
+    cover_hash TEXT,
+    error TEXT,
+    indexed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tracks_directory ON tracks (directory);
+CREATE INDEX IF NOT EXISTS tracks_artist ON tracks (artist);
+CREATE INDEX IF NOT EXISTS tracks_album ON tracks (album);
+CREATE INDEX IF NOT EXISTS tracks_genre ON tracks (genre);
+CREATE INDEX IF NOT EXISTS tracks_year ON tracks (year);
+CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5(
+    title, artist, album, genre, path, content='tracks', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS tracks_fts_insert AFTER INSERT ON tracks BEGIN
+    INSERT INTO tracks_fts (rowid, title, artist, album, genre, path)
+    VALUES (new.rowid, new.title, new.artist, new.album, new.genre, new.path);
+END;
+CREATE TRIGGER IF NOT EXISTS tracks_fts_delete AFTER DELETE ON tracks BEGIN
+    INSERT INTO tracks_fts (tracks_fts, rowid, title, artist, album, genre, path)
+    VALUES ('delete', old.rowid, old.title, old.artist, old.album, old.genre, old.path);
+END;
+CREATE TRIGGER IF NOT EXISTS tracks_fts_update AFTER UPDATE ON tracks BEGIN
+    INSERT INTO tracks_fts (tracks_fts, rowid, title, artist, album, genre, path)
+    VALUES ('delete', old.rowid, old.title, old.artist, old.album, old.genre, old.path);
+    INSERT INTO tracks_fts (rowid, title, artist, album, genre, path)
+    VALUES (new.rowid, new.title, new.artist, new.album, new.genre, new.path);
+END;
+"""
+# Columns stored per track, in table order
+INDEX_COLUMNS = [
+    'path', 'directory', 'size', 'mtime_ns', 'inode', 'kind', 'title', 'artist', 'album', 'genre',
+    'year', 'track', 'disc', 'duration', 'bitrate', 'sample_rate', 'channels', 'pictures',
+    'cover_hash', 'error', 'indexed_at',
+]
+# Fields `query --where/--missing` may filter on
+QUERY_FIELDS = ('title', 'artist', 'album', 'genre', 'year', 'track', 'disc', 'kind', 'cover_hash', 'directory')
+# Rows written per index transaction
+INDEX_BATCH = 500
+
+def open_index_db(db_path: str) -> 'sqlite3.Connection':
+    """Opens (and creates if needed) the library tag index."""
+    import sqlite3
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(INDEX_SCHEMA)
+    conn.commit()
+    return conn
+
+def track_codec(audio, kind: str) -> str:
+    """Short codec name for a loaded file: the MP4 sample entry (e.g. ``mp4a.40.2``), else the format."""
+    if kind == 'mp4':
+        return getattr(audio.info, 'codec', None) or 'mp4'
+    return kind
+
+def read_track_fields(file_path: str, kind: str) -> Dict:
+    """Normalised tags, stream info and cover hash of one file, as flat row fields.
+
+    Tags are read the way the audit reads them (multi-values joined, year
+    cut to four digits, track and disc as numbers). A file mutagen cannot
+    read comes back with only ``pictures`` and ``error`` set.
+    """
+    fields = {'pictures': 0}
+    try:
+        audio = get_file_handler(file_path)
+        summary = tag_summary(audio, kind)
+    except Exception as e:
+        fields['error'] = str(e) or type(e).__name__
+        return fields
+
+    for field in ('title', 'artist', 'album', 'genre', 'year'):
+        fields[field] = summary[field] or None
+    fields['track'] = first_number(summary['track']) if summary['track'] else None
+    fields['disc'] = first_number(summary['disc']) if summary['disc'] else None
+    info = audio.info
+    fields['codec'] = track_codec(audio, kind)
+    fields['duration'] = round(getattr(info, 'length', 0) or 0, 3)
+    fields['bitrate'] = getattr(info, 'bitrate', None)
+    fields['sample_rate'] = getattr(info, 'sample_rate', None)
+    fields['channels'] = getattr(info, 'channels', None)
+    fields['pictures'] = len(summary['pictures'])
+    if summary['pictures']:
+        fronts = [digest for kind, digest in summary['pictures'] if kind == 3]
+        fields['cover_hash'] = (fronts or [summary['pictures'][0][1]])[0]
+    return fields
 
-def main():
+def index_file(job: Tuple[str, Tuple[int, int, int]]) -> Dict:
+    """Builds the index row of one file on a pool worker.
+
+    ``job`` is (path, stat key seen by the walker). A file mutagen cannot
+    read still gets a row, with ``error`` set, so it is not retried until
+    it changes.
+    """
+    file_path, (size, mtime_ns, inode) = job
+    row = dict.fromkeys(INDEX_COLUMNS)
+    row.update(
+        path=file_path, directory=os.path.dirname(file_path), size=size, mtime_ns=mtime_ns, inode=inode,
+        kind=get_file_kind(file_path), indexed_at=datetime.now().isoformat(timespec='seconds'),
+    )
+    row.update(read_track_fields(file_path, row['kind']))
+    return row
+
+def run_index(root: str, db_path: str, workers: int = 1) -> int:
+    """Brings the tag index for ``root`` up to date, reading only new or changed files."""
+    started = time.perf_counter()
+    root = os.path.abspath(root)
+    print("---------------------------------------")
+    print("🗂️ LIBRARY INDEX")
+    print(f"Library: {root}")
+    print(f"Index  : {db_path}")
+    print("---------------------------------------")
+
+    conn = open_index_db(db_path)
+    counts = {'unchanged': 0, 'indexed': 0, 'removed': 0, 'errors': 0}
+    seen_dirs = set()
+
+    def changed_files() -> Iterator[Tuple[str, Tuple[int, int, int]]]:
+        # One directory's stored fingerprints at a time keeps memory flat on big libraries
+        for directory, audio, _ in walk_library(root):
+            seen_dirs.add(directory)
+            stored = {
+                path: (size, mtime_ns, inode)
+                for path, size, mtime_ns, inode in conn.execute(
+                    "SELECT path, size, mtime_ns, inode FROM tracks WHERE directory = ?", (directory,)
+                )
+            }
+            for file_name, st in audio:
+                path = os.path.join(directory, file_name)
+                key = stat_key(st)
+                if stored.pop(path, None) == key:
+                    counts['unchanged'] += 1
+                else:
+                    yield path, key
+            if stored:
+                conn.executemany("DELETE FROM tracks WHERE path = ?", [(path,) for path in stored])
+                counts['removed'] += len(stored)
+
+    placeholders = ', '.join('?' for _ in INDEX_COLUMNS)
+    updates = ', '.join(f"{column} = excluded.{column}" for column in INDEX_COLUMNS[1:])
+    upsert = (f"INSERT INTO tracks ({', '.join(INDEX_COLUMNS)}) VALUES ({placeholders}) "
+              f"ON CONFLICT (path) DO UPDATE SET {updates}")
+
+    executor = create_executor(workers)
+    try:
+        for row in bounded_map(index_file, changed_files(), executor, window=max(workers, 1) * 16):
+            conn.execute(upsert, [row[column] for column in INDEX_COLUMNS])
+            counts['indexed'] += 1
+            counts['errors'] += row['error'] is not None
+            if counts['indexed'] % INDEX_BATCH == 0:
+                conn.commit()
+                print(f"  ... {counts['indexed']} file(s) indexed")
+    finally:
+        if executor:
+            executor.shutdown()
+
+    # Folders that disappeared since the last run
+    prefix = root.rstrip(os.sep) + os.sep
+    gone = [
+        directory for (directory,) in conn.execute(
+            "SELECT DISTINCT directory FROM tracks WHERE directory = ? OR substr(directory, 1, ?) = ?",
+            (root, len(prefix), prefix)
+        ) if directory not in seen_dirs
+    ]
+    for directory in gone:
+        counts['removed'] += conn.execute("DELETE FROM tracks WHERE directory = ?", (directory,)).rowcount
+    conn.commit()
+    conn.close()
+
+    print("\n--- INDEX SUMMARY ---")
+    print(f"Indexed  : {counts['indexed']} ({counts['errors']} unreadable)")
+    print(f"Unchanged: {counts['unchanged']} (not opened)")
+    print(f"Removed  : {counts['removed']}")
+    print(f"Elapsed  : {time.perf_counter() - started:.1f}s")
+    return 0
+
+def run_query(
+    db_path: str,
+    text: Optional[str] = None,
+    where: Optional[List[str]] = None,
+    missing: Optional[List[str]] = None,
+    albums: bool = False,
+    limit: int = 0,
+    report_format: str = 'text'
+) -> int:
+    """Answers a question from the index alone, without touching the audio files.
+
+    ``text`` is an FTS5 query over title/artist/album/genre/path, ``where``
+    holds FIELD=VALUE filters (case-insensitive) and ``missing`` fields that
+    must be empty. With ``albums`` results are grouped per folder.
+    """
+    import sqlite3
+
+    if not os.path.isfile(db_path):
+        print(f"❌ No index at {db_path}. Build it with: album_tagger.py index ROOT --db {db_path}")
+        return 2
+
+    clauses, params = [], []
+    if text:
+        clauses.append("tracks.rowid IN (SELECT rowid FROM tracks_fts WHERE tracks_fts MATCH ?)")
+        params.append(text)
+    for condition in where or []:
+        field, _, value = condition.partition('=')
+        field = field.strip().lower()
+        if field not in QUERY_FIELDS:
+            print(f"❌ Unknown field '{field}'. Choose from: {', '.join(QUERY_FIELDS)}")
+            return 2
+        clauses.append(f"{field} = ? COLLATE NOCASE")
+        params.append(value.strip())
+    for field in missing or []:
+        field = field.strip().lower()
+        if field not in QUERY_FIELDS:
+            print(f"❌ Unknown field '{field}'. Choose from: {', '.join(QUERY_FIELDS)}")
+            return 2
+        clauses.append(f"({field} IS NULL OR {field} = '')")
+
+    where_sql = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    if albums:
+        columns = ['directory', 'album', 'artist', 'year', 'tracks']
+        sql = (f"SELECT directory, group_concat(DISTINCT album), group_concat(DISTINCT artist), "
+               f"group_concat(DISTINCT year), count(*) FROM tracks{where_sql} GROUP BY directory ORDER BY directory")
+    else:
+        columns = ['path', 'artist', 'album', 'track', 'title', 'genre', 'year', 'duration']
+        sql = f"SELECT {', '.join(columns)} FROM tracks{where_sql} ORDER BY directory, disc, track, path"
+    if limit > 0:
+        sql += f" LIMIT {int(limit)}"
+
+    started = time.perf_counter()
+    conn = open_index_db(db_path)
+    writer = csv.writer(sys.stdout) if report_format == 'csv' else None
+    if writer:
+        writer.writerow(columns)
+    count = 0
+    try:
+        for row in conn.execute(sql, params):
+            count += 1
+            if writer:
+                writer.writerow(row)
+            elif report_format == 'json':
+                print(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            else:
+                print('\t'.join('' if value is None else str(value) for value in row))
+    except sqlite3.OperationalError as e:
+        print(f"❌ Invalid query: {e}")
+        return 2
+    finally:
+        conn.close()
+    print(f"({count} result(s) in {(time.perf_counter() - started) * 1000:.1f} ms)", file=sys.stderr)
+    return 0
+
+# --- CATALOGUE EXPORT ---
+# Columns of one exported track, in output order
+EXPORT_FIELDS = [
+    'path', 'directory', 'file_name', 'kind', 'codec', 'title', 'artist', 'album', 'genre', 'year',
+    'track', 'disc', 'duration', 'bitrate', 'sample_rate', 'channels', 'pictures', 'cover_hash',
+    'size', 'modified', 'error',
+]
+EXPORT_INT_FIELDS = ('track', 'disc', 'bitrate', 'sample_rate', 'channels', 'pictures', 'size')
+# Rows per Parquet row group (and per buffered write for the text formats)
+DEFAULT_EXPORT_CHUNK = 10000
+
+def export_album(job: Tuple[str, List[Tuple[str, int, int]]]) -> List[Dict]:
+    """Reads one album folder on a pool worker and returns its export rows.
+
+    ``job`` is (directory, [(file name, size, mtime_ns)]) as seen by the
+    walker, so the worker does not stat anything again.
+    """
+    directory, files = job
+    rows = []
+    for file_name, size, mtime_ns in files:
+        file_path = os.path.join(directory, file_name)
+        row = dict.fromkeys(EXPORT_FIELDS)
+        row.update(
+            path=file_path, directory=directory, file_name=file_name, kind=get_file_kind(file_path),
+            size=size, modified=datetime.fromtimestamp(mtime_ns / 1e9).isoformat(timespec='seconds'),
+        )
+        row.update(read_track_fields(file_path, row['kind']))
+        rows.append(row)
+    return rows
+
+def open_export_writer(
+    out: TextIO,
+    output: Optional[str],
+    export_format: str,
+    chunk_rows: int
+) -> Tuple[Callable[[Dict], None], Callable[[], None]]:
+    """Returns (write_row, close) for one export stream.
+
+    JSONL and CSV rows go straight to ``out``; Parquet rows are buffered
+    and written to ``output`` one row group of ``chunk_rows`` at a time, so
+    memory stays flat however large the library is.
+    """
+    if export_format == 'jsonl':
+        def write_row(row: Dict) -> None:
+            out.write(json.dumps(row, ensure_ascii=False) + '\n')
+        return write_row, out.flush
+
+    if export_format == 'csv':
+        writer = csv.DictWriter(out, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        return writer.writerow, out.flush
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (field, pa.int64() if field in EXPORT_INT_FIELDS else pa.float64() if field == 'duration' else pa.string())
+        for field in EXPORT_FIELDS
+    ])
+    parquet = pq.ParquetWriter(output, schema)
+    buffer: List[Dict] = []
+
+    def flush() -> None:
+        if buffer:
+            parquet.write_table(pa.Table.from_pylist(buffer, schema=schema))
+            buffer.clear()
+
+    def write_row(row: Dict) -> None:
+        buffer.append(row)
+        if len(buffer) >= chunk_rows:
+            flush()
+
+    def close() -> None:
+        flush()
+        parquet.close()
+    return write_row, close
+
+def run_export(
+    root: str,
+    output: Optional[str] = None,
+    export_format: Optional[str] = None,
+    workers: int = 1,
+    ordered: bool = True,
+    chunk_rows: int = DEFAULT_EXPORT_CHUNK
+) -> int:
+    """Walks the library read-only and streams one row per track as JSONL, CSV or Parquet."""
+    if not export_format:
+        extension = os.path.splitext(output or '')[1].lower()
+        export_format = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet'}.get(extension, 'jsonl')
+    if export_format == 'parquet':
+        if not output:
+            print("❌ Parquet export needs --output PATH.")
+            return 2
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("❌ Parquet export needs pyarrow (pip install pyarrow); use --format jsonl or csv instead.")
+            return 2
+
+    out = open(output, 'w', encoding='utf-8', newline='') if output and export_format != 'parquet' else sys.stdout
+    # The catalogue may be going to stdout; keep progress and the summary out of it
+    console = sys.stdout if output else sys.stderr
+    print("---------------------------------------", file=console)
+    print(f"📤 CATALOGUE EXPORT ({export_format})", file=console)
+    print(f"Library: {root}", file=console)
+    print("---------------------------------------", file=console)
+
+    jobs = (
+        (directory, [(file_name, st.st_size, st.st_mtime_ns) for file_name, st in audio])
+        for directory, audio, _ in walk_library(root, log=lambda message: print(message, file=console))
+    )
+    write_row, close = open_export_writer(out, output, export_format, max(chunk_rows, 1))
+    executor = create_executor(workers)
+    started = time.perf_counter()
+    album_count = track_count = unreadable = total_bytes = 0
+    try:
+        for rows in bounded_map(export_album, jobs, executor, window=max(workers, 1) * 4, ordered=ordered):
+            album_count += 1
+            for row in rows:
+                track_count += 1
+                unreadable += row['error'] is not None
+                total_bytes += row['size']
+                write_row(row)
+    finally:
+        if executor:
+            executor.shutdown()
+        close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+
+    print("\n--- EXPORT SUMMARY ---", file=console)
+    print(f"Albums     : {album_count}", file=console)
+    print(f"Tracks     : {track_count} ({format_bytes(total_bytes)})", file=console)
+    print(f"Unreadable : {unreadable}", file=console)
+    print(f"Time       : {elapsed:.2f} s ({track_count / elapsed if elapsed else 0:.0f} tracks/s)", file=console)
+    if output:
+        print(f"\n📄 Catalogue written to {output}", file=console)
+    return 0
+
+def gather_album(directory: str, keep_handlers: bool = True, profile: Optional[Dict] = None) -> Optional[Dict]:
+    """Runs the prompts for one album folder and returns its tagging plan.
+
+    prefetch_album is started on a background thread as soon as the folder
+    is scanned; the plan's ``prefetch`` future yields its result. Returns
+    None when the folder has no supported audio files. The plan's
+    ``tracklist`` is empty when the operator declined the tracklist.
+    """
+    with profiled(profile, 'scan'):
+        track_files = get_audio_files(directory)
+    if not track_files:
+        return None
+
+    # Parse the tracks and read the cover candidates while the prompts below wait for input
+    from concurrent.futures import ThreadPoolExecutor
+
+    prefetcher = ThreadPoolExecutor(max_workers=1)
+    prefetch = prefetcher.submit(
+        prefetch_album, directory, track_files, list_cover_candidates(directory), keep_handlers
+    )
+    prefetcher.shutdown(wait=False)
+    plan = {
+        'directory': directory, 'tracklist': [], 'album': None,
+        'cover': None, 'mime': None, 'prefetch': prefetch,
+    }
+
+    # 1. Confirm Tracklist
+    with profiled(profile, 'prompts'):
+        plan['tracklist'] = confirm_tracklist(track_files)
+    if not plan['tracklist']:
+        return plan
+
+    # Use 'Unknown Smuggler' as default artist from context
+    default_artist = DEFAULT_ARTIST
+    default_album_title = infer_album_title(directory)
+
+    with profiled(profile, 'prompts'):
+        # 2. Gather Album Metadata
+        plan['album'] = get_user_metadata(default_artist, default_album_title)
+
+        # 3. Find Cover Art
+        plan['cover'], plan['mime'] = find_cover_art(directory)
+    return plan
+
+def run_interactive(workers: int = 1, tag_options: Optional[Dict] = None) -> int:
     current_dir = os.getcwd()
     print("---------------------------------------")
     print("🚀 AEiOU'S ALBUM METADATA MANAGER v1.0")
@@ -261,41 +2749,410 @@ def main():
     print(f"Session Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("---------------------------------------")
 
-    track_files = get_audio_files(current_dir)
-    if not track_files:
+    tag_options = tag_options or {}
+    profile = tag_options.get('profile')
+
+    plan = gather_album(current_dir, keep_handlers=workers <= 1, profile=profile)
+    if plan is None:
         supported = ', '.join(AUDIO_EXTS)
         print(f"❌ No supported audio files ({supported}) found.")
-        return
-
-    # 1. Confirm Tracklist
-    confirmed_tracklist = confirm_tracklist(track_files)
-    if not confirmed_tracklist:
-        return
-    
-    # Use 'Unknown Smuggler' as default artist from context
-    default_artist = "Unknown Smuggler" 
-    default_album_title = infer_album_title(current_dir)
-
-    # 2. Gather Album Metadata
-    album_meta = get_user_metadata(default_artist, default_album_title)
+        return 1
+    if not plan['tracklist']:
+        return 0
+    album, cover_art_path = plan['album'], plan['cover']
 
-    # 3. Find Cover Art
-    cover_art_path, mime_type = find_cover_art(current_dir)
+    with profiled(profile, 'prefetch_wait'):
+        prefetched = plan['prefetch'].result()
 
     # 4. Apply Tags
-    apply_tags(confirmed_tracklist, album_meta, cover_art_path, mime_type)
+    executor = create_executor(workers)
+    try:
+        with profiled(profile, 'apply_tags'):
+            stats = apply_tags(
+                plan['tracklist'], album, cover_art_path, plan['mime'],
+                executor=executor, prefetched=prefetched, **tag_options
+            )
+    finally:
+        if executor:
+            executor.shutdown()
     
     print("\n--- SESSION SUMMARY ---")
-    print(f"Album : {album_meta['title']}")
-    print(f"Artist: {album_meta['artist']}")
-    print(f"Genre : {album_meta['genre']}")
-    print(f"Year  : {album_meta['year']}")
+    print(f"Album : {album.title}")
+    print(f"Artist: {album.artist}")
+    print(f"Genre : {album.genre}")
+    print(f"Year  : {album.year}")
     if cover_art_path:
         print(f"Cover : {cover_art_path}")
     else:
         print("Cover : (not embedded)")
+    print_tag_stats(stats)
+    print_failures(tag_options.get('failures'))
 
+    if stats['failed']:
+        print("\n⚠️ Finished with errors. See the list above for details.")
+        return 1
     print("\n✅ All tracks tagged successfully. Execution complete.")
+    return 0
+
+# --- SESSION MODE ---
+def session_status(status: Dict) -> str:
+    """One-line summary of the session's background tagging queue."""
+    current = status['current']
+    queued = status['submitted'] - status['tagged'] - (1 if current else 0)
+    parts = [f"{status['tagged'] + status['skipped']}/{status['albums']} albums done"]
+    if current:
+        parts.append(f"tagging '{current}' {status['tracks_done']}/{status['tracks_total']}")
+    if queued:
+        parts.append(f"{queued} queued")
+    if status['failed']:
+        parts.append(f"{status['failed']} failed track(s)")
+    return "⏳ " + ", ".join(parts)
+
+def tag_queued_album(plan: Dict, status: Dict, executor: Optional['Executor'], tag_options: Dict) -> Dict[str, int]:
+    """Tags one planned album on the session's tagging thread.
+
+    Output is collected in ``plan['log']`` and progress in ``status`` so
+    nothing is printed over the prompts of the next album.
+    """
+    status['tracks_done'] = 0
+    status['tracks_total'] = len(plan['tracklist'])
+    status['current'] = plan['album'].title
+
+    def progress(done: int, total: int) -> None:
+        status['tracks_done'] = done
+
+    try:
+        stats = apply_tags(
+            plan['tracklist'], plan['album'], plan['cover'], plan['mime'],
+            directory=plan['directory'], executor=executor, prefetched=plan['prefetch'].result(),
+            log=plan['log'].append, progress=progress, **tag_options
+        )
+        status['failed'] += stats['failed']
+        return stats
+    finally:
+        status['current'] = None
+        status['tagged'] += 1
+
+def report_finished_albums(queue: deque, totals: Dict[str, int]) -> None:
+    """Prints the outcome of every album at the head of ``queue`` that has finished tagging."""
+    while queue and queue[0][1].done():
+        plan, future = queue.popleft()
+        try:
+            stats = future.result()
+        except Exception as e:
+            stats = {'failed': len(plan['tracklist'])}
+            plan['log'].append(f"  [ERROR] Tagging stopped: {e}")
+        for key, count in stats.items():
+            totals[key] = totals.get(key, 0) + count
+        mark = "⚠️" if stats.get('failed') else "✅"
+        print(f"{mark} Tagged '{plan['album'].title}': {stats.get('written', 0)} written, "
+              f"{stats.get('unchanged', 0) + stats.get('cached', 0)} unchanged, {stats.get('failed', 0)} failed")
+        for line in plan['log']:
+            print(line)
+
+def run_session(directories: List[str], workers: int = 1, tag_options: Optional[Dict] = None) -> int:
+    """Prompts for each album folder in turn while earlier albums are tagged in the background.
+
+    Albums are tagged one after another on a single tagging thread (tracks
+    still fan out over ``workers`` processes), in the order they were
+    confirmed. Finished albums are reported between prompts; after the last
+    prompt a rolling status line is shown until the queue drains.
+    """
+    started = time.perf_counter()
+    print("---------------------------------------")
+    print("🚀 AEiOU'S ALBUM METADATA MANAGER v1.0 — SESSION MODE")
+    print(f"Albums: {len(directories)}")
+    print(f"Session Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("---------------------------------------")
+
+    tag_options = tag_options or {}
+    profile = tag_options.get('profile')
+    # 'tagged', 'failed' and the track counters are only written by the tagging thread
+    status = {
+        'albums': len(directories), 'submitted': 0, 'tagged': 0, 'skipped': 0, 'failed': 0,
+        'current': None, 'tracks_done': 0, 'tracks_total': 0,
+    }
+
+    from concurrent.futures import ThreadPoolExecutor, wait
+
+    executor = create_executor(workers)
+    tagger = ThreadPoolExecutor(max_workers=1)
+    queue: deque = deque()
+    totals: Dict[str, int] = {}
+    try:
+        for index, directory in enumerate(directories, start=1):
+            report_finished_albums(queue, totals)
+            print(f"\n=== [{index}/{len(directories)}] {directory} ===")
+            if queue:
+                print(session_status(status))
+
+            plan = None
+            if os.path.isdir(directory):
+                plan = gather_album(os.path.abspath(directory), keep_handlers=workers <= 1, profile=profile)
+            if plan is None or not plan['tracklist']:
+                print("  [SKIPPED] No supported audio files found." if plan is None
+                      else "  [SKIPPED] No tracks confirmed.")
+                status['skipped'] += 1
+                continue
+
+            plan['log'] = []
+            status['submitted'] += 1
+            queue.append((plan, tagger.submit(tag_queued_album, plan, status, executor, tag_options)))
+            print(f"📥 Queued '{plan['album'].title}' for tagging.")
+
+        with profiled(profile, 'session_wait'):
+            pending = [future for _, future in queue]
+            while pending:
+                print(f"\r{session_status(status):<79}", end='', flush=True)
+                pending = list(wait(pending, timeout=0.25).not_done)
+            if queue:
+                print(f"\r{session_status(status):<79}")
+        report_finished_albums(queue, totals)
+    finally:
+        tagger.shutdown()
+        if executor:
+            executor.shutdown()
+
+    return finish_batch(len(directories), totals, started, tag_options.get('failures'))
+
+def add_tagging_options(parser: argparse.ArgumentParser, subcommand: bool = False) -> None:
+    """Options shared by every command that writes tags.
+
+    The top-level parser holds the defaults. On a ``subcommand`` parser the
+    options default to SUPPRESS, so a value given before the subcommand
+    name is kept instead of being reset by the subparser's own default.
+    """
+    def option(*names, **kwargs) -> None:
+        if subcommand:
+            kwargs['default'] = argparse.SUPPRESS
+        parser.add_argument(*names, **kwargs)
+
+    option(
+        '--workers', type=int, default=1, metavar='N',
+        help="Tag tracks on N worker processes (default: 1, in-process)."
+    )
+    option(
+        '--force', action='store_true',
+        help="Rewrite every file even when its tags already match."
+    )
+    option(
+        '--padding-kb', type=int, default=DEFAULT_PADDING_KB, metavar='KB',
+        help="Padding reserved when a tag outgrows its space and the file must be "
+             f"rewritten (default: {DEFAULT_PADDING_KB})."
+    )
+    option(
+        '--max-cover-px', type=int, default=0, metavar='PX',
+        help="Scale cover art down to at most PX pixels on its longest side before embedding (needs Pillow)."
+    )
+    option(
+        '--max-cover-kb', type=int, default=0, metavar='KB',
+        help="Recompress cover art to at most KB kilobytes before embedding (needs Pillow)."
+    )
+    option(
+        '--cover-cache', metavar='DIR',
+        help="Keep covers processed by --max-cover-px/--max-cover-kb in DIR, keyed by image content."
+    )
+    option(
+        '--cover-cache-mb', type=int, default=DEFAULT_COVER_CACHE_MB, metavar='MB',
+        help=f"Size cap of --cover-cache; least recently used covers are evicted (default: {DEFAULT_COVER_CACHE_MB})."
+    )
+    option(
+        '--state-db', metavar='PATH',
+        help="SQLite file remembering what was applied, so unchanged files are skipped unopened."
+    )
+    option(
+        '--hash-audio', action='store_true',
+        help="With --state-db, record a hash of each file's audio data (tags excluded) "
+             "for later verification. Reads every written or checked file in full."
+    )
+    option(
+        '--verify', action='store_true',
+        help="Re-read every written file and check its tags, cover and audio data; "
+             "exit non-zero with the list of files that failed."
+    )
+    option(
+        '--journal', metavar='PATH',
+        help="Write-ahead journal of planned and finished writes for resuming an interrupted run."
+    )
+    option(
+        '--resume', action='store_true',
+        help="Replay only the unfinished writes recorded in --journal (no manifest or prompts)."
+    )
+    option(
+        '--profile', action='store_true',
+        help="Print per-phase and per-file timings and byte counts at the end of the run."
+    )
+    option(
+        '--profile-report', metavar='PATH',
+        help="With --profile, also write one JSON line of timings per file to PATH."
+    )
+    option(
+        '--cprofile', metavar='PATH',
+        help="Dump cProfile stats of the main process to PATH (view with python -m pstats)."
+    )
+
+def tagging_options(args: argparse.Namespace) -> Dict:
+    """Translates the shared tagging options into apply_tags keyword arguments."""
+    return {
+        'skip_unchanged': not args.force,
+        'padding_kb': max(args.padding_kb, 0),
+        'cover_limits': {
+            'max_px': max(args.max_cover_px, 0), 'max_kb': max(args.max_cover_kb, 0),
+        } if args.max_cover_px > 0 or args.max_cover_kb > 0 else None,
+        'cover_cache': open_cover_cache(args.cover_cache, args.cover_cache_mb) if args.cover_cache else None,
+        'state_db': open_state_db(args.state_db) if args.state_db else None,
+        'hash_audio': args.hash_audio,
+        'verify': args.verify,
+        'failures': [],
+        'journal': open_journal(args.journal, resume=args.resume) if args.journal else None,
+        'profile': new_profile(args.profile_report) if args.profile else None,
+    }
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Command line: no arguments runs the interactive tagger in the current folder."""
+    parser = argparse.ArgumentParser(
+        description="Album Metadata Manager: tag an album interactively or a whole library headlessly."
+    )
+    add_tagging_options(parser)
+    commands = parser.add_subparsers(dest='command')
+
+    batch = commands.add_parser('batch', help="Tag albums from a JSON/CSV manifest without prompts.")
+    batch.add_argument(
+        'manifest', nargs='?',
+        help=f"Manifest file with columns: {', '.join(MANIFEST_FIELDS)} (not needed with --resume)."
+    )
+    add_tagging_options(batch, subcommand=True)
+
+    session = commands.add_parser(
+        'session', help="Prompt for several album folders in a row while earlier ones are tagged."
+    )
+    session.add_argument('directories', nargs='+', metavar='DIR', help="Album folders, in prompt order.")
+    add_tagging_options(session, subcommand=True)
+
+    dedupe = commands.add_parser(
+        'dedupe-pictures', help="Remove duplicated embedded pictures from FLAC files in a library."
+    )
+    dedupe.add_argument('root', help="Library folder to scan recursively.")
+    dedupe.add_argument('--dry-run', action='store_true', help="Report duplicates without writing.")
+    dedupe.add_argument('--workers', type=int, default=1, metavar='N', help="Worker processes (default: 1).")
+    dedupe.add_argument(
+        '--padding-kb', type=int, default=DEFAULT_PADDING_KB, metavar='KB',
+        help=f"Padding left after the cleanup (default: {DEFAULT_PADDING_KB})."
+    )
+
+    audit = commands.add_parser('audit', help="Report inconsistent albums in a library without writing anything.")
+    audit.add_argument('root', help="Library folder to scan recursively.")
+    audit.add_argument('--output', metavar='PATH', help="Report file (default: stdout).")
+    audit.add_argument(
+        '--format', dest='report_format', choices=('json', 'csv'),
+        help="Report format (default: csv for a .csv --output, json otherwise)."
+    )
+    audit.add_argument('--issues-only', action='store_true', help="Only report albums with findings.")
+    audit.add_argument('--workers', type=int, default=1, metavar='N', help="Worker processes (default: 1).")
+
+    index = commands.add_parser('index', help="Build or refresh a searchable tag index of a library.")
+    index.add_argument('root', help="Library folder to scan recursively.")
+    index.add_argument('--db', required=True, metavar='PATH', help="Index database file.")
+    index.add_argument('--workers', type=int, default=1, metavar='N', help="Worker processes (default: 1).")
+
+    query = commands.add_parser('query', help="Search the tag index without opening any audio file.")
+    query.add_argument('text', nargs='?', help="Full-text search over title/artist/album/genre/path (FTS5 syntax).")
+    query.add_argument('--db', required=True, metavar='PATH', help="Index database file.")
+    query.add_argument(
+        '--where', action='append', metavar='FIELD=VALUE',
+        help=f"Exact, case-insensitive match (repeatable). Fields: {', '.join(QUERY_FIELDS)}."
+    )
+    query.add_argument('--missing', action='append', metavar='FIELD', help="Field must be empty (repeatable).")
+    query.add_argument('--albums', action='store_true', help="One result per album folder.")
+    query.add_argument('--limit', type=int, default=0, metavar='N', help="At most N results.")
+    query.add_argument(
+        '--format', dest='report_format', choices=('text', 'json', 'csv'), default='text',
+        help="Tab-separated text (default), JSON lines or CSV."
+    )
+
+    export = commands.add_parser('export', help="Stream a per-track catalogue of a library as JSONL, CSV or Parquet.")
+    export.add_argument('root', help="Library folder to scan recursively.")
+    export.add_argument('--output', metavar='PATH', help="Catalogue file (default: stdout; required for Parquet).")
+    export.add_argument(
+        '--format', dest='export_format', choices=('jsonl', 'csv', 'parquet'),
+        help="Output format (default: from the --output extension, jsonl otherwise). Parquet needs pyarrow."
+    )
+    export.add_argument('--workers', type=int, default=1, metavar='N', help="Worker processes (default: 1).")
+    export.add_argument(
+        '--unordered', action='store_true',
+        help="Write albums as soon as they are read instead of in walk order."
+    )
+    export.add_argument(
+        '--chunk-rows', type=int, default=DEFAULT_EXPORT_CHUNK, metavar='N',
+        help=f"Rows per Parquet row group (default: {DEFAULT_EXPORT_CHUNK})."
+    )
+
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'dedupe-pictures':
+        return run_dedupe_pictures(
+            args.root, workers=args.workers, dry_run=args.dry_run, padding_kb=max(args.padding_kb, 0)
+        )
+    if args.command == 'audit':
+        return run_audit(
+            args.root, workers=args.workers, output=args.output,
+            report_format=args.report_format, issues_only=args.issues_only
+        )
+    if args.command == 'index':
+        return run_index(args.root, args.db, workers=args.workers)
+    if args.command == 'query':
+        return run_query(
+            args.db, args.text, where=args.where, missing=args.missing,
+            albums=args.albums, limit=args.limit, report_format=args.report_format
+        )
+    if args.command == 'export':
+        return run_export(
+            args.root, output=args.output, export_format=args.export_format,
+            workers=args.workers, ordered=not args.unordered, chunk_rows=args.chunk_rows
+        )
+    if args.resume and not args.journal:
+        parser.error("--resume needs --journal PATH")
+    if args.hash_audio and not args.state_db:
+        parser.error("--hash-audio needs --state-db PATH")
+    if args.command == 'batch' and not args.manifest and not args.resume:
+        parser.error("batch needs a manifest (or --journal PATH --resume)")
+    if args.journal and not args.resume and os.path.isfile(args.journal) and load_journal_pending(args.journal):
+        # Starting afresh would truncate the journal and lose the interrupted run's plan
+        parser.error(f"{args.journal} still lists unfinished writes; replay them with --resume "
+                     f"or delete the journal to start over")
+
+    tag_options = tagging_options(args)
+    profiler = None
+    if args.cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+    try:
+        if profiler:
+            profiler.enable()
+        if args.resume:
+            return run_resume(args.journal, workers=args.workers, tag_options=tag_options)
+        if args.command == 'batch':
+            return run_batch(args.manifest, workers=args.workers, tag_options=tag_options)
+        if args.command == 'session':
+            return run_session(args.directories, workers=args.workers, tag_options=tag_options)
+        return run_interactive(workers=args.workers, tag_options=tag_options)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+        if tag_options['profile'] is not None:
+            print_profile_report(tag_options['profile'])
+            if tag_options['profile']['report'] is not None:
+                tag_options['profile']['report'].close()
+        if tag_options['state_db'] is not None:
+            tag_options['state_db'].close()
+        if tag_options['journal'] is not None:
+            tag_options['journal'].close()
+        if _tk_root is not None:
+            _tk_root.destroy()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
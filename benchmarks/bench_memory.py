@@ -0,0 +1,117 @@
+"""Measures the in-memory footprint of a large tracklist.
+
+Builds the same synthetic library plan two ways and reports bytes per track
+(tracemalloc, so every object the plan keeps alive is counted):
+
+- dicts:   a (file name, title) tuple plus a metadata dict per track, with
+           album strings as freshly parsed from a manifest (one copy per row)
+- records: album_tagger.Track per track plus one album_tagger.Album per
+           album, whose strings are interned
+
+    python benchmarks/bench_memory.py --tracks 1000000 --output memory.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import album_tagger  # noqa: E402
+
+GENRES = ['Techno', 'House', 'Ambient', 'Jazz', 'Rock', 'Pop', 'Classical', 'Hip-Hop']
+
+def library_rows(tracks: int, per_album: int, artists: int) -> Iterator[Tuple[int, int, List[str]]]:
+    """(album index, track number, [file, title, album, artist, genre, year]) rows like a manifest reader yields.
+
+    Every string is built per row, as csv/json parsing would, so equal
+    values are distinct objects unless something interns them.
+    """
+    for index in range(tracks):
+        album_index, number = divmod(index, per_album)
+        yield album_index, number + 1, [
+            f"{number + 1:02d} Track {index}.flac",
+            f"Track {index}",
+            f"Album {album_index}",
+            f"Artist {album_index % artists}",
+            GENRES[album_index % len(GENRES)],
+            str(1960 + album_index % 60),
+        ]
+
+def build_dicts(rows) -> List:
+    plan = []
+    for _, number, (file_name, title, album, artist, genre, year) in rows:
+        plan.append(((file_name, title), {
+            'number': number, 'title': album, 'artist': artist, 'genre': genre, 'year': year,
+        }))
+    return plan
+
+def build_records(rows) -> List:
+    plan = []
+    albums: Dict[int, album_tagger.Album] = {}
+    for album_index, number, (file_name, title, album, artist, genre, year) in rows:
+        if album_index not in albums:
+            albums[album_index] = album_tagger.Album(album, artist, genre, year)
+        plan.append(album_tagger.Track(file_name, title, number))
+    return [plan, albums]
+
+def measure(build: Callable, args: argparse.Namespace) -> Dict[str, float]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    plan = build(library_rows(args.tracks, args.per_album, args.artists))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del plan
+    return {
+        'bytes': used,
+        'mb': round(used / 1048576, 1),
+        'bytes_per_track': round(used / args.tracks, 1),
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark per-track memory of tracklist representations.")
+    parser.add_argument('--tracks', type=int, default=200000)
+    parser.add_argument('--per-album', type=int, default=12, help="Tracks per album.")
+    parser.add_argument('--artists', type=int, default=5000, help="Distinct artists in the library.")
+    parser.add_argument('--output', help="JSON results file (default: stdout).")
+    args = parser.parse_args(argv)
+
+    results = {'dicts': measure(build_dicts, args), 'records': measure(build_records, args)}
+    sample_track = album_tagger.Track('01 Track.flac', 'Track', 1)
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'params': {'tracks': args.tracks, 'per_album': args.per_album, 'artists': args.artists},
+        'object_sizes': {
+            'Track': sys.getsizeof(sample_track),
+            'Album': sys.getsizeof(album_tagger.Album('a', 'b', 'c', 'd')),
+            'tuple(file, title)': sys.getsizeof(('01 Track.flac', 'Track')),
+            'metadata dict': sys.getsizeof({'number': 1, 'title': '', 'artist': '', 'genre': '', 'year': ''}),
+        },
+        'results': results,
+        'saving': round(1 - results['records']['bytes'] / results['dicts']['bytes'], 3),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"dicts: {results['dicts']['bytes_per_track']} B/track, "
+              f"records: {results['records']['bytes_per_track']} B/track "
+              f"({report['saving']:.0%} less)")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
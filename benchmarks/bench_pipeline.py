@@ -0,0 +1,173 @@
+"""Times each phase of the tagging pipeline on a synthetic library.
+
+For every scenario a fresh library is generated, then timed phase by phase:
+
+- scan:       walk_library over the whole tree
+- parse:      get_file_handler on every file
+- parse_tags: read_tags_only on every file
+- build:      build_tag_values + write_tag_values on the loaded handlers
+- save:       save_audio with the tagger's padding policy
+- apply_tags: the end-to-end album loop (forced rewrite, optional workers)
+
+Results are written as JSON so runs from different releases can be diffed.
+
+    python benchmarks/bench_pipeline.py --albums 20 --tracks 12 --output bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mutagen  # noqa: E402
+
+import album_tagger  # noqa: E402
+from synthetic_library import FORMATS, build_library  # noqa: E402
+
+# name -> library options; together they cover fresh files, tight tags and roomy tags with art
+SCENARIOS = {
+    'untagged': {'tagged': False, 'padding_kb': 0, 'picture_kb': 0},
+    'tagged-no-padding': {'tagged': True, 'padding_kb': 0, 'picture_kb': 0},
+    'tagged-padding-picture': {'tagged': True, 'padding_kb': 16, 'picture_kb': 256},
+}
+
+def phase_result(seconds: float, files: int, bytes_total: int) -> Dict[str, float]:
+    return {
+        'seconds': round(seconds, 6),
+        'files': files,
+        'bytes': bytes_total,
+        'files_per_s': round(files / seconds, 1) if seconds else None,
+        'mb_per_s': round(bytes_total / 1048576 / seconds, 1) if seconds and bytes_total else None,
+    }
+
+def run_scenario(root: str, name: str, options: Dict, args: argparse.Namespace) -> Dict:
+    library = os.path.join(root, name)
+    build_library(
+        library, albums=args.albums, tracks=args.tracks, size_kb=args.size_kb,
+        formats=args.formats, picture_kb=options['picture_kb'],
+        tagged=options['tagged'], padding_kb=options['padding_kb']
+    )
+
+    phases: Dict[str, Dict] = {}
+
+    started = time.perf_counter()
+    albums = list(album_tagger.walk_library(library))
+    paths = [os.path.join(directory, file_name) for directory, audio, _ in albums for file_name, _ in audio]
+    sizes = {os.path.join(directory, file_name): st.st_size
+             for directory, audio, _ in albums for file_name, st in audio}
+    total_bytes = sum(sizes.values())
+    phases['scan'] = phase_result(time.perf_counter() - started, len(paths), 0)
+
+    started = time.perf_counter()
+    for path in paths:
+        album_tagger.get_file_handler(path)
+    phases['parse'] = phase_result(time.perf_counter() - started, len(paths), total_bytes)
+
+    started = time.perf_counter()
+    for path in paths:
+        album_tagger.read_tags_only(path)
+    phases['parse_tags'] = phase_result(time.perf_counter() - started, len(paths), total_bytes)
+
+    cover = None
+    cover_path = os.path.join(albums[0][0], 'cover.jpg') if albums else None
+    if cover_path and os.path.isfile(cover_path):
+        cover = album_tagger.prepare_cover_art(cover_path, 'image/jpeg')
+    album = album_tagger.Album('Benchmark', 'Benchmark Artist', 'Noise', '2000')
+
+    build_seconds = save_seconds = 0.0
+    rewrites = 0
+    for number, path in enumerate(paths, start=1):
+        kind = album_tagger.get_file_kind(path)
+        audio = album_tagger.get_file_handler(path)
+        started = time.perf_counter()
+        desired = album_tagger.build_tag_values(kind, f"Retagged {number}", number, len(paths), album)
+        album_tagger.write_tag_values(audio, kind, desired, cover)
+        build_seconds += time.perf_counter() - started
+
+        result = {'rewritten': False}
+        started = time.perf_counter()
+        album_tagger.save_audio(
+            audio, kind, album_tagger.make_padding_policy(album_tagger.DEFAULT_PADDING_KB * 1024, result)
+        )
+        save_seconds += time.perf_counter() - started
+        rewrites += result['rewritten']
+    phases['build'] = phase_result(build_seconds, len(paths), 0)
+    phases['save'] = phase_result(save_seconds, len(paths), total_bytes)
+    phases['save']['full_rewrites'] = rewrites
+
+    executor = album_tagger.create_executor(args.workers)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for directory, audio, _ in albums:
+            album_tagger.apply_tags(
+                [album_tagger.Track(file_name, os.path.splitext(file_name)[0]) for file_name, _ in audio],
+                album, cover_path if cover else None, 'image/jpeg' if cover else None,
+                directory=directory, executor=executor, skip_unchanged=False
+            )
+    phases['apply_tags'] = phase_result(time.perf_counter() - started, len(paths), total_bytes)
+    if executor:
+        executor.shutdown()
+
+    return {'options': options, 'phases': phases}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the tagging pipeline on a synthetic library.")
+    parser.add_argument('--albums', type=int, default=12)
+    parser.add_argument('--tracks', type=int, default=10, help="Tracks per album.")
+    parser.add_argument('--size-kb', type=int, default=2048, help="Approximate audio size per track.")
+    parser.add_argument('--formats', default=','.join(FORMATS), help="Comma separated: mp3,flac,m4a.")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable, default: all).")
+    parser.add_argument('--workers', type=int, default=1, help="Workers for the apply_tags phase.")
+    parser.add_argument('--workdir', help="Where to generate libraries (default: a temp folder, removed).")
+    parser.add_argument('--output', help="JSON results file (default: stdout).")
+    args = parser.parse_args(argv)
+    args.formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+
+    root = args.workdir or tempfile.mkdtemp(prefix='tagger-bench-')
+    try:
+        report = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'mutagen': mutagen.version_string,
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+            },
+            'params': {
+                'albums': args.albums, 'tracks': args.tracks, 'size_kb': args.size_kb,
+                'formats': args.formats, 'workers': args.workers,
+            },
+            'scenarios': {
+                name: run_scenario(root, name, SCENARIOS[name], args)
+                for name in (args.scenario or list(SCENARIOS))
+            },
+        }
+    finally:
+        if not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        for name, scenario in report['scenarios'].items():
+            summary = ', '.join(
+                f"{phase} {values['files_per_s']} files/s" for phase, values in scenario['phases'].items()
+            )
+            print(f"{name}: {summary}")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Measures the cold start of the tagger the way scripted callers see it.
+
+Each run is a fresh interpreter:
+
+- import:  ``python -X importtime -c "import album_tagger"``, parsed from stderr
+- help:    ``python album_tagger.py --help`` wall time (interpreter + import + argparse)
+
+The importtime tree is summarised as the cumulative cost of ``album_tagger``,
+the slowest modules it pulls in and whether any ``mutagen`` module was loaded
+before a file was touched. Results are written as JSON.
+
+    python benchmarks/bench_startup.py --runs 20 --output startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(REPO_ROOT, 'album_tagger.py')
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """Maps module name -> self/cumulative microseconds from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        modules[name.strip()] = {'self_us': int(self_us), 'cumulative_us': int(cumulative_us)}
+    return modules
+
+def time_import() -> Dict[str, Dict[str, int]]:
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import album_tagger'],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(completed.stderr)
+
+def time_help() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, SCRIPT, '--help'], cwd=REPO_ROOT, capture_output=True, check=True)
+    return time.perf_counter() - started
+
+def summarise(samples: List[float]) -> Dict[str, float]:
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 2),
+        'min_ms': round(min(samples) * 1000, 2),
+        'max_ms': round(max(samples) * 1000, 2),
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark album_tagger cold start.")
+    parser.add_argument('--runs', type=int, default=10, help="Fresh interpreters per measurement.")
+    parser.add_argument('--top', type=int, default=10, help="Slowest modules to list.")
+    parser.add_argument('--output', help="JSON results file (default: stdout).")
+    args = parser.parse_args(argv)
+
+    import_samples = []
+    last_modules: Dict[str, Dict[str, int]] = {}
+    for _ in range(args.runs):
+        last_modules = time_import()
+        import_samples.append(last_modules['album_tagger']['cumulative_us'] / 1e6)
+    help_samples = [time_help() for _ in range(args.runs)]
+
+    slowest = sorted(
+        (name for name in last_modules if name != 'album_tagger'),
+        key=lambda name: last_modules[name]['cumulative_us'], reverse=True
+    )[:args.top]
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runs': args.runs,
+        },
+        'import_album_tagger': summarise(import_samples),
+        'help': summarise(help_samples),
+        'slowest_modules': [
+            {'module': name, 'cumulative_ms': round(last_modules[name]['cumulative_us'] / 1000, 2)}
+            for name in slowest
+        ],
+        'mutagen_modules_at_startup': sorted(name for name in last_modules if name.startswith('mutagen')),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"import album_tagger: {report['import_album_tagger']['median_ms']} ms median, "
+              f"--help: {report['help']['median_ms']} ms median")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""Generates a synthetic music library of small but structurally valid files.
+
+MP3 files are MPEG-1 Layer III frames of digital silence, FLAC files are
+CRC-checked verbatim frames of noise and M4A files are a minimal AAC track
+layout (ftyp/moov/mdat). Nothing needs an encoder, so the library can be
+rebuilt anywhere the tagger runs.
+
+    python benchmarks/synthetic_library.py /tmp/synthetic --albums 20 --tracks 12
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import album_tagger  # noqa: E402
+
+FORMATS = ['mp3', 'flac', 'm4a']
+
+# --- MP3 ---
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, joint stereo, no CRC, no padding bit
+MP3_FRAME_HEADER = bytes([0xFF, 0xFB, 0x90, 0x40])
+MP3_FRAME_SIZE = 417
+
+def mp3_audio(size: int) -> bytes:
+    """Silent MP3 frames (zeroed side info means empty granules) totalling about ``size`` bytes."""
+    frame = MP3_FRAME_HEADER + bytes(MP3_FRAME_SIZE - len(MP3_FRAME_HEADER))
+    return frame * max(1, size // MP3_FRAME_SIZE)
+
+# --- FLAC ---
+FLAC_BLOCKSIZE = 4096
+FLAC_SAMPLE_RATE = 44100
+
+def _crc_table(poly: int, width: int) -> List[int]:
+    top = 1 << (width - 1)
+    mask = (1 << width) - 1
+    table = []
+    for byte in range(256):
+        crc = byte << (width - 8)
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) if crc & top else (crc << 1)
+        table.append(crc & mask)
+    return table
+
+CRC8_TABLE = _crc_table(0x07, 8)
+CRC16_TABLE = _crc_table(0x8005, 16)
+
+def crc8(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = CRC8_TABLE[crc ^ byte]
+    return crc
+
+def crc16(data: bytes, crc: int = 0) -> int:
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ CRC16_TABLE[(crc >> 8) ^ byte]
+    return crc
+
+def utf8_number(value: int) -> bytes:
+    """FLAC's extended UTF-8 style coding of frame numbers."""
+    if value < 0x80:
+        return bytes([value])
+    for length, first_bits in ((2, 5), (3, 4), (4, 3), (5, 2), (6, 1), (7, 0)):
+        if value < 1 << (first_bits + 6 * (length - 1)):
+            break
+    out = []
+    for _ in range(length - 1):
+        out.append(0x80 | (value & 0x3F))
+        value >>= 6
+    lead = (0xFF << (8 - length)) & 0xFF
+    return bytes([lead | value] + out[::-1])
+
+def flac_audio(size: int, rng: random.Random) -> bytes:
+    """STREAMINFO plus verbatim stereo 16-bit frames totalling about ``size`` bytes.
+
+    Every frame carries the same noise payload, so the CRC-16 of the payload
+    is folded in through the CRC's linearity instead of being recomputed.
+    """
+    body = bytearray()
+    for _ in range(2):
+        body.append(0b00000010)  # verbatim subframe, no wasted bits
+        body += rng.randbytes(FLAC_BLOCKSIZE * 2)
+    body = bytes(body)
+    zeros = bytes(len(body))
+    body_crc = crc16(body)
+    shift = [crc16(zeros, 1 << bit) for bit in range(16)]
+
+    frames = []
+    frame_count = max(1, size // len(body))
+    for number in range(frame_count):
+        header = bytearray([0xFF, 0xF8, 0x79, 0x18])  # 16-bit blocksize follows, 44.1 kHz, stereo, 16 bps
+        header += utf8_number(number)
+        header += struct.pack('>H', FLAC_BLOCKSIZE - 1)
+        header.append(crc8(header))
+        state = crc16(header)
+        crc = body_crc
+        for bit in range(16):
+            if state >> bit & 1:
+                crc ^= shift[bit]
+        frames.append(bytes(header) + body + struct.pack('>H', crc))
+
+    frame_size = len(frames[0])
+    total_samples = frame_count * FLAC_BLOCKSIZE
+    streaminfo = struct.pack('>HH', FLAC_BLOCKSIZE, FLAC_BLOCKSIZE)
+    streaminfo += frame_size.to_bytes(3, 'big') + frame_size.to_bytes(3, 'big')
+    streaminfo += ((FLAC_SAMPLE_RATE << 44) | (1 << 41) | (15 << 36) | total_samples).to_bytes(8, 'big')
+    streaminfo += bytes(16)  # MD5 unknown
+    return b'fLaC' + bytes([0x80]) + len(streaminfo).to_bytes(3, 'big') + streaminfo + b''.join(frames)
+
+# --- M4A ---
+AAC_FRAME_SAMPLES = 1024
+
+def _atom(name: bytes, payload: bytes) -> bytes:
+    return struct.pack('>I', 8 + len(payload)) + name + payload
+
+def _full_atom(name: bytes, payload: bytes) -> bytes:
+    return _atom(name, bytes(4) + payload)
+
+def m4a_audio(size: int) -> bytes:
+    """A single AAC-LC track whose ``mdat`` holds about ``size`` bytes of fixed-size samples."""
+    sample_size = 372
+    sample_count = max(1, size // sample_size)
+    duration = sample_count * AAC_FRAME_SAMPLES
+
+    ftyp = _atom(b'ftyp', b'M4A ' + bytes(4) + b'M4A mp42isom')
+    mvhd = _full_atom(b'mvhd', struct.pack('>IIII', 0, 0, 44100, duration) + bytes(80))
+    tkhd = _full_atom(b'tkhd', struct.pack('>IIIII', 0, 0, 1, 0, duration) + bytes(60))
+    mdhd = _full_atom(b'mdhd', struct.pack('>IIIIHH', 0, 0, 44100, duration, 0x55C4, 0))
+    hdlr = _full_atom(b'hdlr', bytes(4) + b'soun' + bytes(12) + b'SoundHandler\x00')
+
+    decoder_specific = b'\x05\x02\x12\x10'  # AAC LC, 44.1 kHz, stereo
+    decoder_config = bytes([0x40, 0x15, 0, 0, 0]) + struct.pack('>II', 128000, 128000) + decoder_specific
+    es_descriptor = b'\x00\x01\x00' + bytes([0x04, len(decoder_config)]) + decoder_config + b'\x06\x01\x02'
+    esds = _full_atom(b'esds', bytes([0x03, len(es_descriptor)]) + es_descriptor)
+    mp4a = _atom(b'mp4a', bytes(6) + struct.pack('>H', 1) + bytes(8)
+                 + struct.pack('>HHHHI', 2, 16, 0, 0, 44100 << 16) + esds)
+    stsd = _full_atom(b'stsd', struct.pack('>I', 1) + mp4a)
+    stts = _full_atom(b'stts', struct.pack('>III', 1, sample_count, AAC_FRAME_SAMPLES))
+    stsc = _full_atom(b'stsc', struct.pack('>IIII', 1, 1, sample_count, 1))
+    stsz = _full_atom(b'stsz', struct.pack('>II', sample_size, sample_count))
+
+    def moov(chunk_offset: int) -> bytes:
+        stco = _full_atom(b'stco', struct.pack('>II', 1, chunk_offset))
+        stbl = _atom(b'stbl', stsd + stts + stsc + stsz + stco)
+        minf = _atom(b'minf', _full_atom(b'smhd', bytes(4)) + stbl)
+        trak = _atom(b'trak', tkhd + _atom(b'mdia', mdhd + hdlr + minf))
+        return _atom(b'moov', mvhd + trak)
+
+    chunk_offset = len(ftyp) + len(moov(0)) + 8
+    return ftyp + moov(chunk_offset) + _atom(b'mdat', bytes(sample_size * sample_count))
+
+# --- LIBRARY ---
+def make_picture(size: int, rng: random.Random, width: int = 1000, height: int = 1000) -> bytes:
+    """JPEG-shaped bytes of about ``size`` bytes for embedding.
+
+    SOI, a baseline frame header with the given dimensions, random filler
+    in comment segments and EOI, so header probes accept it as a cover
+    without a real encoder.
+    """
+    sof = b'\xff\xc0' + struct.pack('>HBHHB', 17, 8, height, width, 3) + bytes.fromhex('011100021101031101')
+    out = bytearray(b'\xff\xd8' + sof)
+    remaining = max(0, size - len(out) - 2)
+    while remaining > 4:
+        chunk = min(remaining - 4, 65533)
+        out += b'\xff\xfe' + struct.pack('>H', chunk + 2) + rng.randbytes(chunk)
+        remaining -= chunk + 4
+    return bytes(out) + b'\xff\xd9'
+
+def build_library(
+    root: str,
+    albums: int = 10,
+    tracks: int = 10,
+    size_kb: int = 1024,
+    formats: Optional[List[str]] = None,
+    tagged: bool = False,
+    padding_kb: int = 0,
+    picture_kb: int = 0,
+    seed: int = 0
+) -> Dict[str, int]:
+    """Writes ``albums`` folders of ``tracks`` files under ``root``.
+
+    Albums cycle through ``formats``. With ``tagged`` every file gets a full
+    tag set (and a ``picture_kb`` cover when non-zero) saved with
+    ``padding_kb`` of padding. A cover.jpg is left in each album folder when
+    ``picture_kb`` is set. Returns file and byte counts.
+    """
+    rng = random.Random(seed)
+    formats = formats or FORMATS
+    audio_cache: Dict[str, bytes] = {}
+    picture = make_picture(picture_kb * 1024, rng) if picture_kb else None
+    file_count = byte_count = 0
+
+    for album_index in range(albums):
+        fmt = formats[album_index % len(formats)]
+        if fmt not in audio_cache:
+            size = size_kb * 1024
+            audio_cache[fmt] = {
+                'mp3': lambda: mp3_audio(size),
+                'flac': lambda: flac_audio(size, rng),
+                'm4a': lambda: m4a_audio(size),
+            }[fmt]()
+        directory = os.path.join(root, f"Album {album_index + 1:04d}")
+        os.makedirs(directory, exist_ok=True)
+
+        cover = None
+        if picture:
+            cover_path = os.path.join(directory, 'cover.jpg')
+            with open(cover_path, 'wb') as f:
+                f.write(picture)
+            cover = album_tagger.prepare_cover_art(cover_path, 'image/jpeg')
+
+        album = album_tagger.Album(
+            f"Album {album_index + 1}", f"Artist {album_index % 7 + 1}",
+            album_tagger.DEFAULT_GENRE, str(1970 + album_index % 50)
+        )
+        for track_index in range(tracks):
+            path = os.path.join(directory, f"{track_index + 1:02d} Track {track_index + 1}.{fmt}")
+            with open(path, 'wb') as f:
+                f.write(audio_cache[fmt])
+            if tagged:
+                kind = album_tagger.get_file_kind(path)
+                audio = album_tagger.get_file_handler(path)
+                desired = album_tagger.build_tag_values(
+                    kind, f"Track {track_index + 1}", track_index + 1, tracks, album
+                )
+                album_tagger.write_tag_values(audio, kind, desired, cover)
+                album_tagger.save_audio(audio, kind, lambda info: padding_kb * 1024)
+            file_count += 1
+            byte_count += os.path.getsize(path)
+
+    return {'files': file_count, 'bytes': byte_count}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic music library.")
+    parser.add_argument('root', help="Output folder.")
+    parser.add_argument('--albums', type=int, default=10)
+    parser.add_argument('--tracks', type=int, default=10, help="Tracks per album.")
+    parser.add_argument('--size-kb', type=int, default=1024, help="Approximate audio size per track.")
+    parser.add_argument('--formats', default=','.join(FORMATS), help="Comma separated: mp3,flac,m4a.")
+    parser.add_argument('--tagged', action='store_true', help="Write a full tag set to every file.")
+    parser.add_argument('--padding-kb', type=int, default=0, help="Tag padding when --tagged.")
+    parser.add_argument('--picture-kb', type=int, default=0, help="Cover size; embedded when --tagged.")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    counts = build_library(
+        args.root, albums=args.albums, tracks=args.tracks, size_kb=args.size_kb,
+        formats=[fmt.strip() for fmt in args.formats.split(',') if fmt.strip()],
+        tagged=args.tagged, padding_kb=args.padding_kb, picture_kb=args.picture_kb, seed=args.seed
+    )
+    print(f"Wrote {counts['files']} files ({counts['bytes'] / 1048576:.1f} MB) to {args.root}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Byte-level tests for the audio payload parsers behind --hash-audio and --verify."""
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import album_tagger  # noqa: E402
+
+AUDIO = b'\xff\xfb\x90\x00' + bytes(range(256)) * 4
+
+def id3v2(body_size: int, footer: bool = False) -> bytes:
+    """An ID3v2.4 tag of ``body_size`` zero bytes (plus its footer when asked)."""
+    size = bytes((body_size >> shift) & 0x7f for shift in (21, 14, 7, 0))
+    header = b'ID3\x04\x00' + (b'\x10' if footer else b'\x00') + size
+    return header + bytes(body_size) + (b'3DI' + header[3:] if footer else b'')
+
+def id3v1() -> bytes:
+    return b'TAG' + bytes(125)
+
+def apev2(items: bytes = b'x' * 40, with_header: bool = True, size: int = None) -> bytes:
+    """An APEv2 tag; ``size`` overrides the footer's size field."""
+    tag_size = len(items) + 32 if size is None else size
+    flags = 0x80000000 if with_header else 0
+    def block(is_header: bool) -> bytes:
+        block_flags = flags | (0x20000000 if is_header else 0)
+        return (b'APETAGEX' + (2000).to_bytes(4, 'little') + tag_size.to_bytes(4, 'little')
+                + (1).to_bytes(4, 'little') + block_flags.to_bytes(4, 'little') + bytes(8))
+    return (block(True) if with_header else b'') + items + block(False)
+
+def flac_block(code: int, body: bytes, last: bool = False) -> bytes:
+    return bytes(((0x80 if last else 0) | code,)) + len(body).to_bytes(3, 'big') + body
+
+def atom(kind: bytes, body: bytes) -> bytes:
+    return (len(body) + 8).to_bytes(4, 'big') + kind + body
+
+# --- ID3v2 ---
+def test_id3v2_size_reads_syncsafe_size_and_footer():
+    assert album_tagger.id3v2_size(id3v2(300)[:10]) == 310
+    assert album_tagger.id3v2_size(id3v2(300, footer=True)[:10]) == 320
+
+def test_id3v2_size_rejects_other_and_short_headers():
+    assert album_tagger.id3v2_size(b'') == 0
+    assert album_tagger.id3v2_size(b'ID3\x04') == 0
+    assert album_tagger.id3v2_size(AUDIO[:10]) == 0
+
+def test_skip_id3v2_skips_stacked_tags_in_buffers_and_files():
+    data = id3v2(100) + id3v2(50, footer=True) + AUDIO
+    assert album_tagger.skip_id3v2(data) == len(data) - len(AUDIO)
+    assert album_tagger.skip_id3v2(io.BytesIO(data)) == len(data) - len(AUDIO)
+    assert album_tagger.skip_id3v2(b'') == 0
+
+# --- Footers ---
+def test_strip_tag_footers_removes_id3v1_and_apev2_in_either_order():
+    for tail in (id3v1(), apev2(), apev2(with_header=False), apev2() + id3v1(), id3v1() + apev2()):
+        assert album_tagger.strip_tag_footers(AUDIO + tail, 0) == len(AUDIO)
+
+def test_strip_tag_footers_stops_on_corrupt_ape_sizes():
+    for size in (0, 31, 10 ** 6):
+        data = AUDIO + apev2(with_header=False, size=size)
+        assert album_tagger.strip_tag_footers(data, 0) == len(data)
+
+def test_strip_tag_footers_never_cuts_before_start():
+    data = id3v2(20) + id3v1()
+    assert album_tagger.strip_tag_footers(data, 30) == 30
+
+def test_mpeg_payload_ranges():
+    data = id3v2(64) + AUDIO + apev2() + id3v1()
+    assert album_tagger.mpeg_payload_ranges(data) == [(74, 74 + len(AUDIO))]
+    assert album_tagger.mpeg_payload_ranges(b'') == [(0, 0)]
+
+# --- FLAC ---
+def test_flac_payload_ranges_start_after_last_metadata_block():
+    head = b'fLaC' + flac_block(0, bytes(34)) + flac_block(4, b'vorbis') + flac_block(1, bytes(10), last=True)
+    assert album_tagger.flac_payload_ranges(head + AUDIO) == [(len(head), len(head) + len(AUDIO))]
+    prefixed = id3v2(16) + head + AUDIO
+    assert album_tagger.flac_payload_ranges(prefixed) == [(26 + len(head), len(prefixed))]
+
+@pytest.mark.parametrize('data', [
+    b'',
+    AUDIO,
+    b'fLaC',
+    b'fLaC' + flac_block(0, bytes(34)),
+    b'fLaC' + flac_block(0, bytes(34), last=True)[:20],
+])
+def test_flac_payload_ranges_reject_missing_or_truncated_metadata(data):
+    with pytest.raises(ValueError):
+        album_tagger.flac_payload_ranges(data)
+
+# --- MP4 ---
+def test_mp4_payload_ranges_cover_every_mdat():
+    data = atom(b'ftyp', b'M4A ') + atom(b'mdat', b'one') + atom(b'moov', bytes(20)) + atom(b'mdat', b'two')
+    assert [data[start:end] for start, end in album_tagger.mp4_payload_ranges(data)] == [b'one', b'two']
+
+def test_mp4_payload_ranges_handle_64_bit_and_open_ended_sizes():
+    large = (1).to_bytes(4, 'big') + b'mdat' + (16 + 5).to_bytes(8, 'big') + b'large'
+    open_ended = (0).to_bytes(4, 'big') + b'mdat' + b'rest of file'
+    data = atom(b'ftyp', b'M4A ') + large + open_ended
+    assert [data[start:end] for start, end in album_tagger.mp4_payload_ranges(data)] == [b'large', b'rest of file']
+
+def test_mp4_payload_ranges_clip_truncated_mdat():
+    data = atom(b'ftyp', b'M4A ') + atom(b'mdat', AUDIO)[:-100]
+    assert album_tagger.mp4_payload_ranges(data) == [(20, len(data))]
+
+@pytest.mark.parametrize('data', [
+    b'',
+    atom(b'ftyp', b'M4A ') + atom(b'moov', bytes(8)),
+    atom(b'ftyp', b'M4A ') + (4).to_bytes(4, 'big') + b'mdat',
+    (1).to_bytes(4, 'big') + b'mdat' + (8).to_bytes(8, 'big'),
+])
+def test_mp4_payload_ranges_reject_missing_mdat_or_corrupt_atoms(data):
+    with pytest.raises(ValueError):
+        album_tagger.mp4_payload_ranges(data)
+
+# --- Hashing ---
+def test_audio_payload_hash_ignores_tags(tmp_path):
+    plain, tagged = tmp_path / 'plain.mp3', tmp_path / 'tagged.mp3'
+    plain.write_bytes(AUDIO)
+    tagged.write_bytes(id3v2(500) + AUDIO + apev2() + id3v1())
+    assert album_tagger.audio_payload_hash(str(plain)) == album_tagger.audio_payload_hash(str(tagged))
+    assert album_tagger.tag_region_bytes(str(tagged), 'mp3') == tagged.stat().st_size - len(AUDIO)
+
+def test_audio_payload_hash_rejects_empty_and_unknown_files(tmp_path):
+    empty = tmp_path / 'empty.flac'
+    empty.write_bytes(b'')
+    with pytest.raises(ValueError):
+        album_tagger.audio_payload_hash(str(empty))
+    other = tmp_path / 'notes.txt'
+    other.write_bytes(b'hello')
+    with pytest.raises(ValueError):
+        album_tagger.audio_payload_hash(str(other))